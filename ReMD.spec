@@ -7,7 +7,7 @@ Supports macOS and Windows.
 import sys
 from pathlib import Path
 
-from PyInstaller.utils.hooks import collect_all, collect_submodules, copy_metadata
+from PyInstaller.utils.hooks import collect_all, copy_metadata
 
 block_cipher = None
 project_root = Path(SPECPATH)
@@ -15,6 +15,8 @@ is_windows = sys.platform == "win32"
 
 # Collect streamlit and its full dependency tree
 st_datas, st_binaries, st_hiddenimports = collect_all("streamlit")
+# Type stubs (e.g. streamlit/proto/*.pyi) are never read at runtime
+st_datas = [d for d in st_datas if not d[0].endswith(".pyi")]
 st_datas += copy_metadata("streamlit")
 st_datas += copy_metadata("altair")
 st_datas += copy_metadata("packaging")
@@ -56,8 +58,7 @@ a = Analysis(
         "streamlit.web.bootstrap",
         "streamlit.runtime",
         "streamlit.runtime.runtime",
-    ] + st_hiddenimports + _kr_backend_imports
-    + collect_submodules("streamlit"),
+    ] + st_hiddenimports + _kr_backend_imports,
     hookspath=[str(project_root / "hooks")],
     hooksconfig={},
     runtime_hooks=[],
@@ -78,11 +79,17 @@ a = Analysis(
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
-    noarchive=False,
+    # Ship modules as individual .pyc files instead of one PYZ archive:
+    # imports go through the regular path finder and the OS page cache,
+    # with no archive table of contents to load at startup.
+    noarchive=True,
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# One-folder layout (exclude_binaries + COLLECT): nothing is extracted to a
+# temp dir at launch. UPX is disabled because packed binaries have to be
+# decompressed in memory every time they are loaded, which slows startup.
 exe = EXE(
     pyz,
     a.scripts,
@@ -92,7 +99,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     console=True,
     # Windows-only: set icon if available
     icon=str(project_root / "icon.ico") if is_windows and (project_root / "icon.ico").exists() else None,
@@ -104,7 +111,7 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     name="ReMD",
 )
@@ -7,6 +7,7 @@ Supports:
 
 from __future__ import annotations
 
+import os
 import platform
 import shutil
 import subprocess
@@ -16,16 +17,43 @@ from pathlib import Path
 
 def _ensure_dependencies() -> None:
     """Install build & runtime dependencies if missing."""
-    deps = ["streamlit", "requests", "keyring", "pyinstaller"]
+    deps = [
+        "streamlit", "requests", "keyring", "pyinstaller", "orjson", "pybase64",
+    ]
+    if sys.platform != "win32":
+        deps.append("uvloop")  # optional faster event loop, see run.py
+    missing: list[str] = []
     for dep in deps:
         try:
             __import__(dep if dep != "pyinstaller" else "PyInstaller")
         except ImportError:
-            print(f"Installing {dep} ...")
-            subprocess.check_call(
-                [sys.executable, "-m", "pip", "install", dep],
-                stdout=subprocess.DEVNULL,
-            )
+            missing.append(dep)
+
+    # Retry(backoff_jitter=...) needs urllib3 2, but requests also accepts 1.26
+    try:
+        import urllib3
+
+        if int(urllib3.__version__.split(".")[0]) < 2:
+            missing.append("urllib3>=2.0")
+    except ImportError:
+        missing.append("urllib3>=2.0")
+
+    if missing:
+        # One pip run for everything: pip's startup and resolver are paid once
+        print(f"Installing {', '.join(missing)} ...")
+        subprocess.check_call(
+            [
+                sys.executable,
+                "-m",
+                "pip",
+                "install",
+                "--disable-pip-version-check",
+                "--no-input",
+                "--prefer-binary",
+                *missing,
+            ],
+            stdout=subprocess.DEVNULL,
+        )
 
 
 def _remove_pathlib_backport() -> None:
@@ -43,6 +71,22 @@ def _remove_pathlib_backport() -> None:
         pass
 
 
+def _dir_size(root: Path | str) -> int:
+    """Return the total size in bytes of all files under *root*.
+
+    Uses ``os.scandir`` so file type and size come from the directory
+    entries instead of a separate ``Path`` object and ``stat()`` per file.
+    """
+    total = 0
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += _dir_size(entry.path)
+    return total
+
+
 def main() -> None:
     project_root = Path(__file__).resolve().parent
     spec_file = project_root / "ReMD.spec"
@@ -78,6 +122,7 @@ def main() -> None:
         str(spec_file),
         "--clean",
         "--noconfirm",
+        "--log-level=WARN",
     ]
 
     print(f"Running: {' '.join(cmd)}")
@@ -96,7 +141,7 @@ def main() -> None:
     exe_path = dist_dir / exe_name
 
     # Calculate size
-    total_bytes = sum(f.stat().st_size for f in dist_dir.rglob("*") if f.is_file())
+    total_bytes = _dir_size(dist_dir)
     size_mb = total_bytes / (1024 * 1024)
 
     print()
@@ -10,8 +10,8 @@ from PyInstaller.utils.hooks import (
     copy_metadata,
 )
 
-# Streamlit needs its static assets and metadata
-datas = collect_data_files("streamlit")
+# Streamlit needs its static assets and metadata (type stubs are not used)
+datas = collect_data_files("streamlit", excludes=["**/*.pyi"])
 datas += copy_metadata("streamlit")
 
 # Collect all submodules — Streamlit uses dynamic imports
@@ -11,19 +11,28 @@ import requests
 
 PORT = 8501
 URL = f"http://localhost:{PORT}"
+HEALTH_URL = f"{URL}/_stcore/health"
 
 
 def _wait_and_open_browser() -> None:
-    """Wait for the Streamlit server to become ready, then open the browser."""
-    for _ in range(30):  # up to 30 seconds
-        try:
-            resp = requests.get(URL, timeout=2)
-            if resp.status_code == 200:
-                webbrowser.open(URL)
-                return
-        except Exception:
-            pass
-        time.sleep(1)
+    """Wait for the Streamlit server to become ready, then open the browser.
+
+    Polls the lightweight health endpoint with exponential backoff
+    (50 ms doubling up to 1 s) so a fast start is noticed almost immediately.
+    """
+    delay = 0.05
+    deadline = time.monotonic() + 45
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            try:
+                resp = session.get(HEALTH_URL, timeout=0.5, allow_redirects=False)
+                if resp.status_code == 200:
+                    webbrowser.open(URL)
+                    return
+            except Exception:
+                pass
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
 
 
 def main() -> None:
@@ -58,6 +67,17 @@ def main() -> None:
     if getattr(sys, "_MEIPASS", None):
         app_path = str(Path(sys._MEIPASS) / "src" / "ReMD" / "app.py")
 
+    # Serve Tornado on libuv when available (optional; not on Windows)
+    if sys.platform != "win32":
+        try:
+            import asyncio
+
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+
     # Open browser in a background thread once the server is up
     threading.Thread(target=_wait_and_open_browser, daemon=True).start()
 
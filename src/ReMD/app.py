@@ -2,31 +2,59 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
 import os
-import re
 import signal
+from typing import TYPE_CHECKING, Callable
 
 import streamlit as st
 from streamlit.components.v1 import html as st_html
 
 from ReMD.file_filter import (
     compile_patterns,
-    matches_any_pattern,
+    compile_union,
     parse_pattern_input,
+    split_backref_patterns,
+    split_suffix_patterns,
     validate_patterns,
 )
-from ReMD.markdown_renderer import render_markdown
-from ReMD.models import ProviderType
-from ReMD.providers.azure_devops import AzureDevOpsError, AzureDevOpsProvider
-from ReMD.providers.github import GitHubError, GitHubProvider, RateLimitError
-from ReMD.url_parser import URLParseError, parse_repo_url
 from ReMD import token_store
 
+if TYPE_CHECKING:
+    from ReMD.models import FileEntry, RepoInfo
+    from ReMD.providers.base import RepoProvider
 
-def _qp(key: str, default: str = "") -> str:
-    """Read a query parameter, returning *default* if absent."""
-    params = st.query_params
-    return params.get(key, default)
+
+_FILTER_LABEL = "File filter (regex, comma-separated)"
+
+# Targets the input by its aria-label directly; a `:has()` selector on the
+# surrounding container forces the browser to re-match the whole subtree.
+_FILTER_ERROR_CSS = f"""<style>
+input[aria-label="{_FILTER_LABEL}"] {{
+    border-color: #ff4b4b !important;
+    box-shadow: 0 0 0 1px #ff4b4b !important;
+}}
+</style>"""
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _validate_filter(filter_raw: str) -> list[str]:
+    """Return validation error messages for the filter input."""
+    return validate_patterns(parse_pattern_input(filter_raw))
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _get_path_filter(filter_raw: str) -> Callable[[str], bool] | None:
+    """Compile the filter input into a path predicate (None means no filter).
+
+    Cached per raw string so reruns do not recompile the same regexes.
+    Only call this for input that passed `_validate_filter`.
+    """
+    patterns = parse_pattern_input(filter_raw)
+    if not patterns:
+        return None
+    return _path_predicate(patterns)
 
 
 def main() -> None:
@@ -36,6 +64,10 @@ def main() -> None:
         layout="wide",
     )
 
+    # Read the query string once; each st.query_params access goes through
+    # Streamlit's proxy.
+    qp = st.query_params.to_dict()
+
     # Hide Streamlit's default toolbar (Deploy, Stop, etc.)
     st.markdown(
         "<style>[data-testid='stToolbar'] { display: none; }</style>",
@@ -54,7 +86,7 @@ def main() -> None:
             saved_gh = token_store.load("github_token") or ""
             github_token = st.text_input(
                 "GitHub Token (optional)",
-                value=_qp("token") or saved_gh,
+                value=qp.get("token", "") or saved_gh,
                 type="password",
                 help="Required for private repos. Increases rate limit from 60 to 5,000 requests/hour.",
             )
@@ -62,7 +94,7 @@ def main() -> None:
             saved_azdo = token_store.load("azdo_pat") or ""
             azdo_pat = st.text_input(
                 "Azure DevOps PAT (optional)",
-                value=_qp("pat") or saved_azdo,
+                value=qp.get("pat", "") or saved_azdo,
                 type="password",
                 help="Required for private Azure DevOps repositories.",
             )
@@ -89,7 +121,7 @@ def main() -> None:
                     if saved_azdo:
                         token_store.delete("azdo_pat")
 
-            default_size = float(_qp("max_size", "1.0"))
+            default_size = float(qp.get("max_size", "1.0"))
             max_file_size_mb = st.number_input(
                 "Max file size (MB)",
                 min_value=0.1,
@@ -107,14 +139,14 @@ def main() -> None:
     # --- Main area ---
     url = st.text_input(
         "Repository URL",
-        value=_qp("url"),
+        value=qp.get("url", ""),
         placeholder="https://github.com/owner/repo",
     )
 
     # --- Regex filter ---
     filter_raw = st.text_input(
-        "File filter (regex, comma-separated)",
-        value=_qp("filter"),
+        _FILTER_LABEL,
+        value=qp.get("filter", ""),
         placeholder=r"\.py$, \.ts$, src/.*\.js$",
         help=(
             "Only files whose path matches at least one pattern will be included. "
@@ -123,34 +155,35 @@ def main() -> None:
     )
 
     # Validate patterns in real-time
-    filter_patterns = parse_pattern_input(filter_raw)
-    filter_errors = validate_patterns(filter_patterns) if filter_patterns else []
+    filter_errors = _validate_filter(filter_raw)
     has_filter_error = bool(filter_errors)
 
     if has_filter_error:
         # Red border via custom CSS + error messages
-        st.markdown(
-            """<style>
-            div[data-testid="stTextInput"]:has(input[aria-label="File filter (regex, comma-separated)"]) input {
-                border-color: #ff4b4b !important;
-                box-shadow: 0 0 0 1px #ff4b4b !important;
-            }
-            </style>""",
-            unsafe_allow_html=True,
-        )
+        st.markdown(_FILTER_ERROR_CSS, unsafe_allow_html=True)
         for err in filter_errors:
             st.error(f"Invalid regex: {err}")
 
-    convert_clicked = st.button(
-        "Convert",
-        type="primary",
-        use_container_width=True,
-        disabled=has_filter_error,
-    )
+    convert_col, refresh_col = st.columns([5, 1])
+    with convert_col:
+        convert_clicked = st.button(
+            "Convert",
+            type="primary",
+            use_container_width=True,
+            disabled=has_filter_error,
+        )
+    with refresh_col:
+        if st.button(
+            "Refresh",
+            use_container_width=True,
+            help="Discard cached file lists and fetch them again on the next Convert.",
+        ):
+            _list_files_cached.clear()
+            _refresh_provider(url, github_token, azdo_pat)
 
     if convert_clicked and url:
-        compiled = compile_patterns(filter_patterns)
-        _run_conversion(url, github_token, azdo_pat, max_file_size, compiled)
+        path_filter = _get_path_filter(filter_raw)
+        _run_conversion(url, github_token, azdo_pat, max_file_size, path_filter)
     elif convert_clicked:
         st.error("Please enter a repository URL.")
 
@@ -164,7 +197,7 @@ def main() -> None:
 
 def _show_result(result: dict) -> None:
     """Display download button and preview from a stored result."""
-    markdown_output = result["markdown"]
+    markdown_bytes = result["markdown"]
     filename = result["filename"]
     errors = result["errors"]
 
@@ -175,25 +208,160 @@ def _show_result(result: dict) -> None:
 
     st.download_button(
         label="Download Markdown",
-        data=markdown_output,
+        data=markdown_bytes,
         file_name=filename,
         mime="text/markdown",
         use_container_width=True,
     )
 
     _PREVIEW_MAX_LINES = 1000
-    preview_lines = markdown_output.split("\n")
+    preview, truncated = _head_lines(markdown_bytes, _PREVIEW_MAX_LINES)
     with st.expander("Preview", expanded=True):
-        if len(preview_lines) > _PREVIEW_MAX_LINES:
-            truncated = "\n".join(preview_lines[:_PREVIEW_MAX_LINES])
-            st.code(truncated, language="markdown")
+        st.code(preview.decode("utf-8", errors="replace"), language="markdown")
+        if truncated:
+            total_lines = markdown_bytes.count(b"\n") + 1
             st.caption(
                 f"Preview is truncated to {_PREVIEW_MAX_LINES:,} lines "
-                f"(total {len(preview_lines):,} lines). "
+                f"(total {total_lines:,} lines). "
                 "Download the file for the full content."
             )
-        else:
-            st.code(markdown_output, language="markdown")
+
+
+def _head_lines(data: bytes, n: int) -> tuple[bytes, bool]:
+    """Return the first *n* lines of *data* and whether anything was cut off.
+
+    Scans for newlines instead of splitting, so a large document is never
+    materialized as a list of lines.
+    """
+    idx = -1
+    for _ in range(n):
+        idx = data.find(b"\n", idx + 1)
+        if idx == -1:
+            return data, False
+    return data[:idx], True
+
+
+def _path_predicate(patterns: list[str]) -> Callable[[str], bool]:
+    """Return a function telling whether a path matches any filter pattern.
+
+    Plain suffix patterns (``\\.py$``) are checked with ``str.endswith``;
+    the rest are combined into one alternation so each path is searched once,
+    except patterns with numbered group references, which are searched alone.
+    """
+    suffixes, others = split_suffix_patterns(patterns)
+    combinable, standalone = split_backref_patterns(others)
+
+    # Bind the methods once; the predicate runs for every listed file.
+    searches = [p.search for p in compile_patterns(standalone)]
+    union = compile_union(combinable)
+    if union is not None:
+        searches.insert(0, union.search)
+
+    if not searches:
+        return lambda path: path.endswith(suffixes)
+    if len(searches) == 1:
+        search = searches[0]
+        if not suffixes:
+            return lambda path: search(path) is not None
+        return lambda path: path.endswith(suffixes) or search(path) is not None
+    return lambda path: path.endswith(suffixes) or any(
+        search(path) is not None for search in searches
+    )
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _get_provider(
+    provider_type: str,
+    api_host: str,
+    token_digest: str,
+    _token: str | None,
+) -> RepoProvider:
+    """Return the provider for a host, authenticated with *_token*.
+
+    Cached across reruns and Converts so the provider's HTTP session keeps
+    its pooled keep-alive connections. *_token* is excluded from the cache
+    key; *token_digest* stands in for it.
+    """
+    from ReMD.models import ProviderType
+    from ReMD.providers.azure_devops import AzureDevOpsProvider
+    from ReMD.providers.github import GitHubProvider
+
+    if ProviderType(provider_type) == ProviderType.GITHUB:
+        return GitHubProvider(token=_token, api_host=api_host)
+    return AzureDevOpsProvider(pat=_token)
+
+
+def _provider_for(
+    repo_info: RepoInfo, github_token: str, azdo_pat: str
+) -> tuple[RepoProvider, str, str | None]:
+    """Return the cached provider for *repo_info*, its token digest and token.
+
+    Tokens are stripped to avoid whitespace from copy-paste.
+    """
+    from ReMD.models import ProviderType
+
+    if repo_info.provider == ProviderType.GITHUB:
+        token = github_token.strip() or None
+    else:
+        token = azdo_pat.strip() or None
+    token_digest = _token_digest(token)
+    provider = _get_provider(
+        repo_info.provider.value, repo_info.api_host, token_digest, token
+    )
+    return provider, token_digest, token
+
+
+def _refresh_provider(url: str, github_token: str, azdo_pat: str) -> None:
+    """Make the provider for *url* forget remembered branches and listings.
+
+    The provider itself stays cached, keeping its pooled connections and
+    ETag validators, so the next listing revalidates without using quota.
+    """
+    from ReMD.url_parser import URLParseError, parse_repo_url
+
+    try:
+        repo_info = parse_repo_url(url)
+    except URLParseError:
+        return
+    provider, _, _ = _provider_for(repo_info, github_token, azdo_pat)
+    provider.clear_cache()
+
+
+def _token_digest(token: str | None) -> str:
+    """Return a short, non-reversible fingerprint of *token* for cache keys."""
+    return hashlib.blake2b((token or "").encode(), digest_size=8).hexdigest()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _list_files_cached(
+    provider_type: str,
+    api_host: str,
+    owner: str,
+    project: str | None,
+    repo: str,
+    branch: str | None,
+    token_digest: str,
+    _token: str | None,
+) -> tuple[str | None, list[FileEntry]]:
+    """List repository files, cached so Converts that only change the filter
+    reuse the listing. The Refresh button clears it.
+
+    *_token* is excluded from the cache key (leading underscore);
+    *token_digest* stands in for it. Returns the resolved branch and files.
+    """
+    from ReMD.models import ProviderType, RepoInfo
+
+    repo_info = RepoInfo(
+        provider=ProviderType(provider_type),
+        owner=owner,
+        repo=repo,
+        branch=branch,
+        project=project,
+        api_host=api_host,
+    )
+    provider = _get_provider(provider_type, api_host, token_digest, _token)
+    files = provider.list_files(repo_info)
+    return repo_info.branch, files
 
 
 def _run_conversion(
@@ -201,8 +369,15 @@ def _run_conversion(
     github_token: str,
     azdo_pat: str,
     max_file_size: int,
-    path_patterns: list[re.Pattern[str]] | None = None,
+    path_filter: Callable[[str], bool] | None = None,
 ) -> None:
+    # Imported here so reruns that never convert (typing in the inputs)
+    # do not pay for loading the providers and their HTTP stack.
+    from ReMD.markdown_renderer import write_markdown
+    from ReMD.providers.azure_devops import AzureDevOpsError
+    from ReMD.providers.github import GitHubError, RateLimitError
+    from ReMD.url_parser import URLParseError, parse_repo_url
+
     # Parse URL
     try:
         repo_info = parse_repo_url(url)
@@ -210,31 +385,32 @@ def _run_conversion(
         st.error(f"Invalid URL: {exc}")
         return
 
-    # Select provider (strip tokens to avoid whitespace from copy-paste)
-    gh_token = github_token.strip() or None
-    azdo_token = azdo_pat.strip() or None
-    if repo_info.provider == ProviderType.GITHUB:
-        provider = GitHubProvider(token=gh_token, api_host=repo_info.api_host)
-    else:
-        provider = AzureDevOpsProvider(pat=azdo_token)
+    provider, token_digest, token = _provider_for(repo_info, github_token, azdo_pat)
 
     repo_display = f"{repo_info.owner}/{repo_info.repo}"
 
     try:
         # List files
         with st.spinner("Fetching file list..."):
-            files = provider.list_files(repo_info)
+            repo_info.branch, files = _list_files_cached(
+                repo_info.provider.value,
+                repo_info.api_host,
+                repo_info.owner,
+                repo_info.project,
+                repo_info.repo,
+                repo_info.branch,
+                token_digest,
+                token,
+            )
 
         if not files:
             st.warning("No files found in the repository.")
             return
 
         # Apply regex path filter
-        if path_patterns:
+        if path_filter is not None:
             before = len(files)
-            files = [
-                f for f in files if matches_any_pattern(f.path, path_patterns)
-            ]
+            files = [f for f in files if path_filter(f.path)]
             filtered_out = before - len(files)
         else:
             filtered_out = 0
@@ -256,22 +432,39 @@ def _run_conversion(
         progress_bar = st.progress(0, text="Fetching files...")
         status_text = st.empty()
 
+        # The provider already coalesces progress updates to ~20 Hz; also
+        # skip those that would not move the bar by a whole percent, which
+        # bounds the widget traffic to 100 updates per conversion.
+        bar_update = progress_bar.progress
+        text_update = status_text.text
+        last_pct = -1
         for progress in provider.fetch_all_files(repo_info, files, max_file_size):
-            pct = progress.fetched_files / max(progress.total_files, 1)
-            progress_bar.progress(pct, text=f"Fetching: {progress.current_file}")
-            status_text.text(
+            pct = 100 * progress.fetched_files // max(progress.total_files, 1)
+            if pct == last_pct:
+                continue
+            last_pct = pct
+            bar_update(pct / 100, text=f"Fetching: {progress.current_file}")
+            text_update(
                 f"{progress.fetched_files}/{progress.total_files} files processed"
             )
 
         progress_bar.progress(1.0, text="Done!")
 
         # Render Markdown
-        markdown_output = render_markdown(repo_display, files)
+        # Encode while writing so the document never exists as a str next
+        # to its bytes. The download button keeps a reference to these
+        # bytes rather than a copy (a file object would be read into memory
+        # anyway), and only the preview prefix ever needs decoding again.
+        raw = io.BytesIO()
+        with io.TextIOWrapper(raw, encoding="utf-8", newline="") as out:
+            write_markdown(out, repo_display, files)
+            out.flush()
+            markdown_bytes = raw.getvalue()
         filename = f"{repo_info.owner}_{repo_info.repo}.md"
 
         # Save result to session state so it survives reruns
         st.session_state["result"] = {
-            "markdown": markdown_output,
+            "markdown": markdown_bytes,
             "filename": filename,
             "errors": progress.errors,
         }
@@ -293,26 +486,44 @@ def _run_conversion(
 def _inject_shutdown_heartbeat() -> None:
     """Inject a JS heartbeat that kills the server when the browser tab closes.
 
-    The browser sends a /healthz ping every 3 s via ``setInterval``.
+    The browser keeps one long-poll request to ``/_heartbeat`` open at all
+    times; the server holds each request for up to
+    ``_HEARTBEAT_HOLD_SECONDS`` and the page immediately re-issues it.
     When the tab is closed (``beforeunload``), a final ``/_shutdown`` beacon
     is sent. On the server side a ``tornado.web.RequestHandler`` listens on
     ``/_shutdown`` and terminates the process.
 
-    As a fallback the server also tracks heartbeat timestamps — if no ping
-    arrives for 10 s it self-terminates via a watchdog thread.
+    As a fallback a watchdog thread self-terminates the server once no poll
+    has been open for ``_HEARTBEAT_GRACE_SECONDS`` — a closed tab drops its
+    connection, so this no longer depends on a ping interval.
     """
     _register_shutdown_route()
 
     st_html(
         """
         <script>
-        // Heartbeat ping
-        setInterval(() => {
-            fetch("/_heartbeat").catch(() => {});
-        }, 3000);
+        const ac = new AbortController();
+        let stop = false;
+
+        // Heartbeat long-poll: the server answers after a while, then we
+        // reconnect. Back off for a second on errors.
+        async function beat() {
+            while (!stop) {
+                try {
+                    const resp = await fetch("/_heartbeat", {signal: ac.signal});
+                    if (!resp.ok) throw new Error(resp.statusText);
+                } catch (e) {
+                    if (stop) break;
+                    await new Promise((r) => setTimeout(r, 1000));
+                }
+            }
+        }
+        beat();
 
         // Shutdown on tab close / navigate away
         window.addEventListener("beforeunload", () => {
+            stop = true;
+            ac.abort();
             navigator.sendBeacon("/_shutdown");
         });
         </script>
@@ -322,6 +533,8 @@ def _inject_shutdown_heartbeat() -> None:
 
 
 _SHUTDOWN_REGISTERED = False
+_HEARTBEAT_HOLD_SECONDS = 25
+_HEARTBEAT_GRACE_SECONDS = 10
 
 
 def _register_shutdown_route() -> None:
@@ -331,20 +544,40 @@ def _register_shutdown_route() -> None:
         return
     _SHUTDOWN_REGISTERED = True
 
+    import asyncio
     import threading
     import time
 
     import tornado.web
     from streamlit.runtime.runtime import Runtime
 
+    # Only touched from the Tornado event loop; the watchdog just reads them.
+    open_polls = 0
     last_heartbeat = time.time()
 
     class HeartbeatHandler(tornado.web.RequestHandler):
-        def get(self):
-            nonlocal last_heartbeat
+        def prepare(self):
+            self._gone = asyncio.Event()
+
+        async def get(self):
+            nonlocal open_polls, last_heartbeat
+            open_polls += 1
             last_heartbeat = time.time()
-            self.set_status(200)
-            self.finish("ok")
+            try:
+                await asyncio.wait_for(
+                    self._gone.wait(), timeout=_HEARTBEAT_HOLD_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                open_polls -= 1
+                last_heartbeat = time.time()
+            if not self._gone.is_set():
+                self.set_status(200)
+                self.finish("ok")
+
+        def on_connection_close(self):
+            self._gone.set()
 
     class ShutdownHandler(tornado.web.RequestHandler):
         def post(self):
@@ -360,14 +593,13 @@ def _register_shutdown_route() -> None:
         os.kill(os.getpid(), signal.SIGTERM)
 
     def _watchdog() -> None:
-        """Kill the process if no heartbeat for 10 seconds after the first one."""
-        # Wait for the first heartbeat to arrive (browser loaded)
-        while time.time() - last_heartbeat < 1:
-            time.sleep(3)
-        # Now watch for staleness
+        """Kill the process once no heartbeat poll has been open for a while."""
         while True:
-            time.sleep(5)
-            if time.time() - last_heartbeat > 10:
+            time.sleep(1)
+            if (
+                open_polls == 0
+                and time.time() - last_heartbeat > _HEARTBEAT_GRACE_SECONDS
+            ):
                 _kill()
                 return
 
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import re
 
-# Extensions that are definitely binary — skip without downloading
+# Extensions that are definitely binary — skip without downloading.
+# Keys are lowercase; lookups lowercase the path's extension first.
 BINARY_EXTENSIONS: frozenset[str] = frozenset({
     # Images
     ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg", ".webp", ".tiff",
@@ -21,10 +22,13 @@ BINARY_EXTENSIONS: frozenset[str] = frozenset({
     # Databases
     ".db", ".sqlite", ".sqlite3",
     # Other
-    ".bin", ".dat", ".lock", ".DS_Store",
+    ".bin", ".dat", ".lock", ".ds_store",
 })
 
-# Mapping of extension → Markdown code-fence language hint
+# Longer extensions cannot be binary, so their lookup is skipped.
+_MAX_BINARY_EXT_LEN = max(map(len, BINARY_EXTENSIONS))
+
+# Mapping of lowercase extension → Markdown code-fence language hint
 LANGUAGE_MAP: dict[str, str] = {
     ".py": "python",
     ".js": "javascript",
@@ -68,7 +72,6 @@ LANGUAGE_MAP: dict[str, str] = {
     ".rst": "rst",
     ".tex": "latex",
     ".r": "r",
-    ".R": "r",
     ".scala": "scala",
     ".lua": "lua",
     ".pl": "perl",
@@ -106,30 +109,52 @@ FILENAME_LANGUAGE_MAP: dict[str, str] = {
 def is_binary_by_extension(path: str) -> bool:
     """Check if a file is likely binary based on its extension."""
     dot_pos = path.rfind(".")
-    if dot_pos == -1:
-        return False
-    ext = path[dot_pos:].lower()
-    return ext in BINARY_EXTENSIONS
+    return (
+        dot_pos != -1
+        and len(path) - dot_pos <= _MAX_BINARY_EXT_LEN
+        and path[dot_pos:].lower() in BINARY_EXTENSIONS
+    )
 
 
 def is_binary_by_content(data: bytes) -> bool:
     """Check if content is binary by looking for null bytes in the first 8KB."""
-    return b"\x00" in data[:8192]
+    return data.find(b"\x00", 0, 8192) != -1
 
 
 def get_language_hint(path: str) -> str:
     """Return the Markdown code-fence language hint for a file path."""
-    filename = path.rsplit("/", maxsplit=1)[-1] if "/" in path else path
+    filename = path[path.rfind("/") + 1:]
 
     # Check special filenames first
-    if filename in FILENAME_LANGUAGE_MAP:
-        return FILENAME_LANGUAGE_MAP[filename]
+    hint = FILENAME_LANGUAGE_MAP.get(filename)
+    if hint is not None:
+        return hint
 
-    dot_pos = path.rfind(".")
+    dot_pos = filename.rfind(".")
     if dot_pos == -1:
         return ""
-    ext = path[dot_pos:]
-    return LANGUAGE_MAP.get(ext, LANGUAGE_MAP.get(ext.lower(), ""))
+    return LANGUAGE_MAP.get(filename[dot_pos:].lower(), "")
+
+
+def classify_path(path: str) -> tuple[bool, str]:
+    """Return ``(is_binary, language_hint)`` for a path in a single pass.
+
+    Equivalent to `is_binary_by_extension` and `get_language_hint`, but the
+    filename and extension are extracted only once. Binary files get an
+    empty hint, since they are never rendered.
+    """
+    filename = path[path.rfind("/") + 1:]
+    hint = FILENAME_LANGUAGE_MAP.get(filename)
+    if hint is not None:
+        return False, hint
+
+    dot_pos = filename.rfind(".")
+    if dot_pos == -1:
+        return False, ""
+    ext = filename[dot_pos:].lower()
+    if ext in BINARY_EXTENSIONS:
+        return True, ""
+    return False, LANGUAGE_MAP.get(ext, "")
 
 
 # ---------------------------------------------------------------------------
@@ -158,6 +183,15 @@ def validate_patterns(patterns: list[str]) -> list[str]:
             re.compile(p)
         except re.error as exc:
             errors.append(f"`{p}` — {exc}")
+
+    combinable, _ = split_backref_patterns(patterns)
+    if not errors and len(combinable) > 1:
+        # Individually valid patterns can still clash once combined
+        # (e.g. the same named group used twice).
+        try:
+            re.compile(_union_source(combinable))
+        except re.error as exc:
+            errors.append(f"patterns cannot be combined — {exc}")
     return errors
 
 
@@ -172,12 +206,90 @@ def compile_patterns(patterns: list[str]) -> list[re.Pattern[str]]:
     return compiled
 
 
-def matches_any_pattern(path: str, compiled: list[re.Pattern[str]]) -> bool:
-    """Return True if the path matches **any** of the compiled patterns.
+# Leading global inline flags such as "(?i)", which are only allowed at the
+# very start of a whole expression.
+_GLOBAL_FLAGS_RE = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def _union_source(patterns: list[str]) -> str:
+    """Join patterns into one alternation, scoping any leading global flags."""
+    parts: list[str] = []
+    for p in patterns:
+        flags = ""
+        while m := _GLOBAL_FLAGS_RE.match(p):
+            flags += m.group(1)
+            p = p[m.end():]
+        parts.append(f"(?{flags}:{p})")
+    return "|".join(parts)
+
+
+# A numbered backreference (\1) or conditional ((?(1)...)); an unescaped
+# backslash is one preceded by an even number of backslashes.
+_NUMBERED_REF_RE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?\(\d+\)")
+
+
+def split_backref_patterns(patterns: list[str]) -> tuple[list[str], list[str]]:
+    r"""Separate patterns that refer to capture groups by number.
+
+    Joining patterns into one alternation renumbers their groups, so in
+    ``(a)\1`` combined after ``(x)`` the ``\1`` would refer to ``(x)``.
+
+    Returns ``(combinable, standalone)``, each keeping the input order;
+    *standalone* patterns must be matched on their own.
+    """
+    combinable: list[str] = []
+    standalone: list[str] = []
+    for p in patterns:
+        (standalone if _NUMBERED_REF_RE.search(p) else combinable).append(p)
+    return combinable, standalone
+
+
+def compile_union(patterns: list[str]) -> re.Pattern[str] | None:
+    """Compile patterns into a single alternation ``(?:p1)|(?:p2)|...``.
+
+    One ``search`` on the result is equivalent to trying each pattern in
+    turn, provided none refers to a group by number (see
+    `split_backref_patterns`). Invalid patterns are silently skipped, as in
+    `compile_patterns`.
+    Returns None when no valid pattern remains (no filter). Patterns that
+    clash when combined raise `re.error`; `validate_patterns` reports them.
+    """
+    valid = [p.pattern for p in compile_patterns(patterns)]
+    if not valid:
+        return None
+    return re.compile(_union_source(valid))
+
+
+# A pattern that is nothing but an escaped-dot suffix anchored at the end,
+# e.g. r"\.py$" or r"\.tar\.gz$".
+_SUFFIX_PATTERN_RE = re.compile(r"(?:\\\.[A-Za-z0-9_]+)+\$")
+
+
+def split_suffix_patterns(patterns: list[str]) -> tuple[tuple[str, ...], list[str]]:
+    r"""Separate plain suffix patterns from general regexes.
+
+    Patterns such as ``\.py$`` match exactly the paths ending in ``.py``, so
+    they can be checked with ``str.endswith`` instead of the regex engine.
+
+    Returns ``(suffixes, others)`` where *suffixes* is a tuple suitable for
+    ``str.endswith`` and *others* keeps the remaining patterns in order.
+    """
+    suffixes: list[str] = []
+    others: list[str] = []
+    for p in patterns:
+        if _SUFFIX_PATTERN_RE.fullmatch(p):
+            suffixes.append(p[:-1].replace("\\.", "."))
+        else:
+            others.append(p)
+    return tuple(suffixes), others
+
+
+def matches_any_pattern(path: str, pattern: re.Pattern[str] | None) -> bool:
+    """Return True if the path matches the (combined) filter pattern.
 
     Uses `re.search` so the pattern can match anywhere in the path.
-    If *compiled* is empty every path matches (no filter).
+    If *pattern* is None every path matches (no filter).
     """
-    if not compiled:
+    if pattern is None:
         return True
-    return any(pat.search(path) for pat in compiled)
+    return pattern.search(path) is not None
@@ -2,43 +2,64 @@
 
 from __future__ import annotations
 
+from typing import Iterator, TextIO
+
 from ReMD.models import FileEntry
 from ReMD.tree_builder import build_tree
-from ReMD.file_filter import get_language_hint
 
 
-def render_markdown(
+def iter_markdown(
     repo_display_name: str,
     files: list[FileEntry],
-) -> str:
-    """Render the repository contents as a single Markdown document.
+) -> Iterator[str]:
+    """Yield the repository's Markdown document chunk by chunk.
+
+    Nothing but the file tree is built up front, so callers writing to a
+    stream never hold the whole document.
 
     Args:
         repo_display_name: e.g. "owner/repo"
-        files: list of FileEntry objects with content populated
+        files: list of FileEntry objects with content and language_hint
+            populated (as returned by the providers)
     """
-    parts: list[str] = []
-
-    # Header
-    parts.append(f"# Repository: {repo_display_name}\n")
-
-    # File structure
     text_files = [f for f in files if not f.is_binary and f.content is not None]
-    all_paths = [f.path for f in text_files]
 
-    parts.append("## File Structure\n")
-    parts.append("```")
-    parts.append(build_tree(all_paths))
-    parts.append("```\n")
+    # Header and file structure
+    yield f"# Repository: {repo_display_name}\n\n"
+    yield "## File Structure\n\n```\n"
+    yield build_tree([f.path for f in text_files])
+    yield "\n```\n\n## Files\n"
 
     # File contents
-    parts.append("## Files\n")
-
     for entry in text_files:
-        lang = entry.language_hint or get_language_hint(entry.path)
-        parts.append(f"### `{entry.path}`\n")
-        parts.append(f"```{lang}")
-        parts.append(entry.content or "")
-        parts.append("```\n")
+        yield f"\n### `{entry.path}`\n\n```{entry.language_hint}\n"
+        yield entry.content
+        yield "\n```\n"
+
 
-    return "\n".join(parts)
+def write_markdown(
+    out: TextIO,
+    repo_display_name: str,
+    files: list[FileEntry],
+) -> None:
+    """Write the repository contents to *out* as a single Markdown document.
+
+    Args:
+        out: text stream to write to
+        repo_display_name: e.g. "owner/repo"
+        files: list of FileEntry objects with content populated
+    """
+    out.writelines(iter_markdown(repo_display_name, files))
+
+
+def render_markdown(
+    repo_display_name: str,
+    files: list[FileEntry],
+) -> str:
+    """Render the repository contents as a single Markdown document.
+
+    Args:
+        repo_display_name: e.g. "owner/repo"
+        files: list of FileEntry objects with content populated
+    """
+    return "".join(iter_markdown(repo_display_name, files))
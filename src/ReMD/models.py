@@ -11,7 +11,7 @@ class ProviderType(Enum):
     AZURE_DEVOPS = "azure_devops"
 
 
-@dataclass
+@dataclass(slots=True)
 class RepoInfo:
     provider: ProviderType
     owner: str
@@ -22,16 +22,17 @@ class RepoInfo:
     raw_url: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class FileEntry:
     path: str
     size: int = 0
     is_binary: bool = False
     content: str | None = None
     language_hint: str = ""
+    sha: str = ""  # Git blob id, when the provider reports one
 
 
-@dataclass
+@dataclass(slots=True)
 class FetchProgress:
     total_files: int = 0
     fetched_files: int = 0
@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Generator
-
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
 
-from ReMD.file_filter import get_language_hint, is_binary_by_extension
-from ReMD.models import FetchProgress, FileEntry, RepoInfo
-from ReMD.providers.base import RepoProvider
+from ReMD.file_filter import classify_path
+from ReMD.models import FileEntry, RepoInfo
+from ReMD.providers.base import RepoProvider, make_retry, read_capped
 
 
 class AzureDevOpsError(Exception):
@@ -20,12 +24,27 @@ class AzureDevOpsProvider(RepoProvider):
 
     API_VERSION = "7.1-preview.1"
 
+    max_workers = 16
+
     def __init__(self, pat: str | None = None):
         self.session = requests.Session()
+        # One keep-alive connection per fetch worker; transient errors are
+        # retried on the pooled connection
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=self.max_workers,
+                max_retries=make_retry(),
+            ),
+        )
         self.session.headers["User-Agent"] = "ReMD/1.0"
         if pat:
             self.session.auth = ("", pat)
 
+    def close(self) -> None:
+        self.session.close()
+
     def _api_base(self, repo_info: RepoInfo) -> str:
         return (
             f"https://dev.azure.com/{repo_info.owner}/{repo_info.project}"
@@ -57,7 +76,8 @@ class AzureDevOpsProvider(RepoProvider):
                 "Access denied. The PAT may lack permissions."
             )
         resp.raise_for_status()
-        return resp.json()
+        # Full recursive item listings of large repositories are multi-MB
+        return orjson.loads(resp.content) if orjson is not None else resp.json()
 
     def get_default_branch(self, repo_info: RepoInfo) -> str:
         data = self._api_get(repo_info, "")
@@ -83,25 +103,32 @@ class AzureDevOpsProvider(RepoProvider):
             if item.get("isFolder"):
                 continue
 
-            path = item.get("path", "").lstrip("/")
+            path = item.get("path", "").removeprefix("/")
             if not path:
                 continue
 
-            is_binary = item.get("contentMetadata", {}).get("isBinary", False)
-            if not is_binary:
-                is_binary = is_binary_by_extension(path)
+            is_binary, hint = classify_path(path)
+            if item.get("contentMetadata", {}).get("isBinary", False):
+                # Binary files are never rendered, so they need no hint
+                is_binary, hint = True, ""
 
             files.append(
                 FileEntry(
                     path=path,
-                    size=item.get("size", 0) if not item.get("isFolder") else 0,
+                    size=item.get("size", 0),
                     is_binary=is_binary,
-                    language_hint=get_language_hint(path),
+                    language_hint=hint,
+                    sha=item.get("objectId", ""),
                 )
             )
         return files
 
-    def fetch_file_content(self, repo_info: RepoInfo, file_entry: FileEntry) -> str:
+    def fetch_file_content(
+        self,
+        repo_info: RepoInfo,
+        file_entry: FileEntry,
+        max_bytes: int = 0,
+    ) -> str:
         branch = repo_info.branch or "main"
         params = {
             "path": f"/{file_entry.path}",
@@ -111,52 +138,21 @@ class AzureDevOpsProvider(RepoProvider):
             "api-version": self.API_VERSION,
         }
         url = f"{self._api_base(repo_info)}/items"
-        resp = self.session.get(
+        # Streamed because the listing reports no sizes: an oversized file
+        # is rejected by Content-Length or abandoned mid-transfer.
+        with self.session.get(
             url,
             params=params,
             timeout=30,
             headers={"Accept": "application/octet-stream"},
-        )
-
-        if resp.status_code == 404:
-            raise AzureDevOpsError(f"File not found: {file_entry.path}")
-        resp.raise_for_status()
-
-        return resp.text
-
-    def fetch_all_files(
-        self,
-        repo_info: RepoInfo,
-        files: list[FileEntry],
-        max_file_size: int = 1_000_000,
-    ) -> Generator[FetchProgress, None, None]:
-        progress = FetchProgress(total_files=len(files))
-
-        for entry in files:
-            progress.current_file = entry.path
-
-            if entry.is_binary:
-                progress.skipped_binary += 1
-                progress.fetched_files += 1
-                yield progress
-                continue
-
-            if max_file_size > 0 and entry.size > max_file_size:
-                progress.skipped_binary += 1
-                progress.fetched_files += 1
-                yield progress
-                continue
-
-            try:
-                content = self.fetch_file_content(repo_info, entry)
-                entry.content = content
-            except Exception as exc:
-                # Retry once
-                try:
-                    content = self.fetch_file_content(repo_info, entry)
-                    entry.content = content
-                except Exception as retry_exc:
-                    progress.errors.append(f"{entry.path}: {retry_exc}")
-
-            progress.fetched_files += 1
-            yield progress
+            stream=True,
+        ) as resp:
+            if resp.status_code == 404:
+                raise AzureDevOpsError(f"File not found: {file_entry.path}")
+            resp.raise_for_status()
+            data = read_capped(resp, max_bytes, file_entry.path)
+        file_entry.size = len(data)
+
+        # octet-stream responses carry no charset, so resp.text would run
+        # charset detection over the whole body; source files are UTF-8.
+        return data.decode("utf-8", errors="replace")
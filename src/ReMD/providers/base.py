@@ -2,15 +2,145 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Generator
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Generator
+
+from urllib3.util.retry import Retry
 
 from ReMD.models import FetchProgress, FileEntry, RepoInfo
 
+if TYPE_CHECKING:
+    import requests
+
+
+class FileTooLargeError(Exception):
+    """Raised when a file's content exceeds the size limit while fetching."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        super().__init__(f"{path} is larger than {max_bytes:,} bytes")
+
+
+def make_retry() -> Retry:
+    """Return the transport retry policy shared by the providers' adapters.
+
+    Idempotent GETs are retried on connection errors and 5xx responses with
+    jittered exponential backoff, so parallel workers do not retry in step.
+    Retry-After is left to the providers, which bound how long they wait.
+    """
+    return Retry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_jitter=0.25,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+
+
+def read_capped(resp: requests.Response, max_bytes: int, path: str) -> bytes:
+    """Read a streamed response body, giving up once it exceeds *max_bytes*.
+
+    A non-positive *max_bytes* reads the whole body. Oversized responses are
+    rejected from their Content-Length before any of the body is read.
+    """
+    if max_bytes <= 0:
+        return resp.content
+
+    length = resp.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise FileTooLargeError(path, max_bytes)
+
+    buf = bytearray()
+    for chunk in resp.iter_content(chunk_size=65536):
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise FileTooLargeError(path, max_bytes)
+    return bytes(buf)
+
+
+class _BlobCache:
+    """Thread-safe LRU of file contents keyed by Git blob id.
+
+    A blob id identifies the exact content, so entries never go stale and
+    repeated conversions of the same repository skip unchanged files.
+    Each entry keeps the content's downloaded size in bytes so that hits can
+    be checked against the current size limit. Bounded by the total number
+    of cached characters.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._chars = 0
+        self._data: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sha: str) -> tuple[str, int] | None:
+        """Return (content, size in bytes) for *sha*, or None."""
+        with self._lock:
+            hit = self._data.get(sha)
+            if hit is not None:
+                self._data.move_to_end(sha)
+            return hit
+
+    def put(self, sha: str, content: str, size: int) -> None:
+        """Cache *content*, whose encoded size is *size* bytes."""
+        if len(content) > self.max_chars:
+            return
+        with self._lock:
+            old = self._data.pop(sha, None)
+            if old is not None:
+                self._chars -= len(old[0])
+            self._data[sha] = (content, size)
+            self._chars += len(content)
+            while self._chars > self.max_chars:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._chars = 0
+
+
+# Module-global rather than per provider: a blob id names the same content
+# whichever token or host it was fetched with, so every provider shares it.
+_blob_cache = _BlobCache(max_chars=64_000_000)
+
+# Minimum seconds between progress updates yielded by fetch_all_files.
+_PROGRESS_INTERVAL = 0.05
+
 
 class RepoProvider(ABC):
     """Base class for Git hosting service providers."""
 
+    # Number of files downloaded concurrently by fetch_all_files. Providers
+    # that raise it size their HTTP adapter's pool (pool_maxsize) to match;
+    # 8 stays within requests' default pool of 10.
+    max_workers: int = 8
+
+    # Exceptions that abort fetch_all_files instead of being recorded
+    # as a per-file error (e.g. rate limiting).
+    fatal_errors: tuple[type[Exception], ...] = ()
+
+    def close(self) -> None:
+        """Release pooled HTTP connections held by the provider."""
+
+    def clear_cache(self) -> None:
+        """Forget remembered repository metadata, such as default branches."""
+
+    def __enter__(self) -> RepoProvider:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     @abstractmethod
     def get_default_branch(self, repo_info: RepoInfo) -> str:
         """Return the default branch name for the repository."""
@@ -20,8 +150,18 @@ class RepoProvider(ABC):
         """List all files in the repository."""
 
     @abstractmethod
-    def fetch_file_content(self, repo_info: RepoInfo, file_entry: FileEntry) -> str:
-        """Fetch the content of a single file."""
+    def fetch_file_content(
+        self,
+        repo_info: RepoInfo,
+        file_entry: FileEntry,
+        max_bytes: int = 0,
+    ) -> str:
+        """Fetch the content of a single file.
+
+        Sets ``file_entry.size`` to the downloaded size in bytes. Raises
+        FileTooLargeError if *max_bytes* is positive and the content turns
+        out to be larger.
+        """
 
     def fetch_all_files(
         self,
@@ -31,33 +171,91 @@ class RepoProvider(ABC):
     ) -> Generator[FetchProgress, None, None]:
         """Fetch content for all files, yielding progress updates.
 
+        Downloads run concurrently on up to ``max_workers`` threads; progress
+        is updated on the calling thread as each download completes. Files
+        whose blob id was fetched before are served from memory.
+
+        Progress is yielded at most every ``_PROGRESS_INTERVAL`` seconds;
+        the final state (all files processed) is always yielded.
+
         Args:
             repo_info: Repository information.
             files: List of files to fetch.
             max_file_size: Skip files larger than this (bytes). Default 1MB.
         """
         progress = FetchProgress(total_files=len(files))
+        last_yield = float("-inf")
 
-        for entry in files:
-            progress.current_file = entry.path
+        # Binary and oversized files are known from the listing alone:
+        # count them in one go instead of one progress step each
+        to_fetch = [
+            entry
+            for entry in files
+            if not (entry.is_binary or entry.size > max_file_size > 0)
+        ]
+        progress.skipped_binary = len(files) - len(to_fetch)
+        progress.fetched_files = progress.skipped_binary
 
-            if entry.is_binary:
-                progress.skipped_binary += 1
-                progress.fetched_files += 1
-                yield progress
-                continue
+        def due() -> bool:
+            nonlocal last_yield
+            now = time.monotonic()
+            if (
+                now - last_yield < _PROGRESS_INTERVAL
+                and progress.fetched_files < progress.total_files
+            ):
+                return False
+            last_yield = now
+            return True
 
-            if entry.size > max_file_size > 0:
-                progress.skipped_binary += 1
-                progress.fetched_files += 1
-                yield progress
-                continue
+        if progress.fetched_files and due():
+            yield progress
 
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: dict[Future[str], FileEntry] = {}
             try:
-                content = self.fetch_file_content(repo_info, entry)
-                entry.content = content
-            except Exception as exc:
-                progress.errors.append(f"{entry.path}: {exc}")
+                for entry in to_fetch:
+                    cached = _blob_cache.get(entry.sha) if entry.sha else None
+                    if cached is not None:
+                        content, size = cached
+                        progress.current_file = entry.path
+                        if size > max_file_size > 0:
+                            # Listed size was missing (e.g. Azure DevOps) or
+                            # the limit was lowered since it was cached
+                            progress.skipped_binary += 1
+                        else:
+                            entry.content = content
+                        progress.fetched_files += 1
+                        if due():
+                            yield progress
+                        continue
 
-            progress.fetched_files += 1
-            yield progress
+                    # Transient failures are retried by the session's adapter
+                    future = executor.submit(
+                        self.fetch_file_content, repo_info, entry, max_file_size
+                    )
+                    futures[future] = entry
+
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    progress.current_file = entry.path
+                    try:
+                        entry.content = future.result()
+                        if entry.sha:
+                            _blob_cache.put(entry.sha, entry.content, entry.size)
+                    except FileTooLargeError:
+                        # Listed size was missing or stale
+                        progress.skipped_binary += 1
+                    except self.fatal_errors:
+                        raise
+                    except Exception as exc:
+                        progress.errors.append(f"{entry.path}: {exc}")
+
+                    progress.fetched_files += 1
+                    if due():
+                        yield progress
+            except BaseException:
+                # Fatal error or the consumer stopped iterating:
+                # drop queued downloads instead of waiting for them.
+                for future in futures:
+                    future.cancel()
+                raise
@@ -2,14 +2,34 @@
 
 from __future__ import annotations
 
+import base64
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Generator
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from ReMD.file_filter import get_language_hint, is_binary_by_extension
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+try:
+    import pybase64 as _b64
+except ImportError:  # optional speedup, see the "speedups" extra
+    _b64 = base64
+
+from ReMD.file_filter import classify_path
 from ReMD.models import FetchProgress, FileEntry, RepoInfo
-from ReMD.providers.base import RepoProvider
+from ReMD.providers.base import (
+    FileTooLargeError,
+    RepoProvider,
+    make_retry,
+    read_capped,
+)
 
 
 class GitHubError(Exception):
@@ -27,10 +47,70 @@ class RateLimitError(GitHubError):
         )
 
 
+class _TreeCache:
+    """Thread-safe LRU bounded by the number of tree entries it holds.
+
+    Tree responses range from a handful of entries to hundreds of
+    thousands, so counting responses would not bound memory.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = 0
+        self._data: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            self._data.move_to_end(key)
+            return hit[0]
+
+    def put(self, key: str, value: object, entries: int) -> None:
+        # Every response costs at least one, so small ones are bounded too
+        entries += 1
+        if entries > self.max_entries:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._entries -= old[1]
+            self._data[key] = (value, entries)
+            self._entries += entries
+            while self._entries > self.max_entries:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._entries -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._entries = 0
+
+
 class GitHubProvider(RepoProvider):
     """Provider for GitHub repositories using the REST API."""
 
-    def __init__(self, token: str | None = None, api_host: str = "github.com"):
+    fatal_errors = (RateLimitError,)
+
+    max_workers = 16
+
+    # Tree entries kept by each of the ETag and subtree caches; a parsed
+    # entry takes a few hundred bytes.
+    tree_cache_entries = 100_000
+
+    # When fewer API calls than this remain, wait for the window to reset
+    # instead of running into the limit, if the reset is close enough.
+    rate_limit_buffer = 10
+    max_rate_limit_wait = 60.0
+
+    def __init__(
+        self,
+        token: str | None = None,
+        api_host: str = "github.com",
+        wait_on_rate_limit: bool = False,
+    ):
         if api_host == "github.com":
             self.api_base = "https://api.github.com"
             self.raw_base = "https://raw.githubusercontent.com"
@@ -39,21 +119,137 @@ class GitHubProvider(RepoProvider):
             self.raw_base = f"https://{api_host}/raw"
 
         self.session = requests.Session()
+        # One keep-alive connection per fetch worker, for each of the API
+        # and raw hosts. Transient errors are retried on the pooled
+        # connection rather than surfacing as failed files; rate-limit
+        # Retry-After is bounded in _api_get.
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=self.max_workers,
+                max_retries=make_retry(),
+            ),
+        )
         self.session.headers["Accept"] = "application/vnd.github+json"
         self.session.headers["User-Agent"] = "ReMD/1.0"
         if token:
             self.session.headers["Authorization"] = f"Bearer {token}"
 
+        # URL -> (ETag, JSON body) for revalidating metadata and tree calls;
+        # GitHub does not count 304 responses against the rate limit.
+        self._etag_cache = _TreeCache(self.tree_cache_entries)
+
+        # Sleep once through an exhausted rate limit (if it resets within
+        # max_rate_limit_wait) instead of raising RateLimitError
+        self.wait_on_rate_limit = wait_on_rate_limit
+
+        # Last seen X-RateLimit-Remaining / X-RateLimit-Reset
+        self._rl_remaining: int | None = None
+        self._rl_reset = 0
+
+        # (owner, repo) pairs whose files raw.githubusercontent.com does not
+        # serve (e.g. private repos): fetch them via the Contents API only.
+        # Re-probed on every fetch_all_files run, as a 404 may be transient.
+        self._raw_unavailable: set[tuple[str, str]] = set()
+
+        # (owner, repo) -> default branch, and tree sha -> recursive tree
+        # items (immutable, as tree shas are content addresses)
+        self._default_branches: dict[tuple[str, str], str] = {}
+        self._subtrees = _TreeCache(self.tree_cache_entries)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def clear_cache(self) -> None:
+        """Forget remembered default branches, subtree listings and raw misses.
+
+        ETag-validated responses are kept: the next request revalidates them
+        with If-None-Match, and a 304 costs no rate-limit quota.
+        """
+        self._default_branches.clear()
+        self._raw_unavailable.clear()
+        self._subtrees.clear()
+
     def _check_rate_limit(self, response: requests.Response) -> None:
         remaining = response.headers.get("X-RateLimit-Remaining")
-        if remaining is not None and int(remaining) == 0:
-            reset_at = int(response.headers.get("X-RateLimit-Reset", 0))
+        if remaining is None:
+            return
+        reset_at = int(response.headers.get("X-RateLimit-Reset", 0))
+        self._rl_remaining = int(remaining)
+        self._rl_reset = reset_at
+        if self._rl_remaining == 0:
             raise RateLimitError(reset_at)
 
-    def _api_get(self, path: str, params: dict | None = None) -> dict:
+    def _throttle(self) -> None:
+        """Sleep until the rate-limit window resets if the budget is nearly spent."""
+        remaining = self._rl_remaining
+        if remaining is None or remaining >= self.rate_limit_buffer:
+            return
+        wait = self._rl_reset - time.time()
+        if 0 < wait <= self.max_rate_limit_wait:
+            time.sleep(wait)
+            self._rl_remaining = None
+
+    def _retry_after(self, response: requests.Response) -> float | None:
+        """Return the Retry-After delay of a secondary rate-limit response."""
+        if response.status_code not in (403, 429):
+            return None
+        value = response.headers.get("Retry-After", "")
+        return float(value) if value.isdigit() else None
+
+    def _send(
+        self, url: str, params: dict | None, headers: dict | None
+    ) -> requests.Response:
+        """GET *url*, waiting out a short secondary rate limit once."""
+        self._throttle()
+        resp = self.session.get(url, params=params, timeout=30, headers=headers)
+        delay = self._retry_after(resp)
+        if delay is not None:
+            if delay > self.max_rate_limit_wait:
+                raise RateLimitError(int(time.time() + delay))
+            time.sleep(delay)
+            resp = self.session.get(url, params=params, timeout=30, headers=headers)
+        return resp
+
+    def _api_get(
+        self,
+        path: str,
+        params: dict | None = None,
+        conditional: bool = False,
+    ) -> dict:
+        """GET an API path and return the JSON body.
+
+        With *conditional*, the response is cached by ETag and later calls
+        send If-None-Match, reusing the cached body on 304 Not Modified.
+        """
         url = f"{self.api_base}{path}"
-        resp = self.session.get(url, params=params, timeout=30)
-        self._check_rate_limit(resp)
+        cached = None
+        headers = None
+        if conditional:
+            query = sorted((params or {}).items())
+            key = url + "?" + "&".join(f"{k}={v}" for k, v in query)
+            cached = self._etag_cache.get(key)
+            if cached is not None:
+                headers = {"If-None-Match": cached[0]}
+
+        for attempt in range(2):
+            resp = self._send(url, params, headers)
+            if cached is not None and resp.status_code == 304:
+                return cached[1]
+            try:
+                self._check_rate_limit(resp)
+                break
+            except RateLimitError as exc:
+                wait = exc.reset_at - time.time()
+                if (
+                    attempt
+                    or not self.wait_on_rate_limit
+                    or wait > self.max_rate_limit_wait
+                ):
+                    raise
+                time.sleep(max(wait, 0.0))
+                self._rl_remaining = None
 
         if resp.status_code == 404:
             raise GitHubError(
@@ -66,11 +262,23 @@ class GitHubProvider(RepoProvider):
                 "Access denied. The token may lack permissions, or rate limit exceeded."
             )
         resp.raise_for_status()
-        return resp.json()
+        # Recursive trees of large repositories are multi-MB JSON documents
+        data = orjson.loads(resp.content) if orjson is not None else resp.json()
+
+        etag = resp.headers.get("ETag")
+        if conditional and etag:
+            self._etag_cache.put(key, (etag, data), len(data.get("tree", ())))
+        return data
 
     def get_default_branch(self, repo_info: RepoInfo) -> str:
-        data = self._api_get(f"/repos/{repo_info.owner}/{repo_info.repo}")
-        return data["default_branch"]
+        key = (repo_info.owner, repo_info.repo)
+        branch = self._default_branches.get(key)
+        if branch is None:
+            data = self._api_get(
+                f"/repos/{repo_info.owner}/{repo_info.repo}", conditional=True
+            )
+            branch = self._default_branches[key] = data["default_branch"]
+        return branch
 
     def list_files(self, repo_info: RepoInfo) -> list[FileEntry]:
         branch = repo_info.branch
@@ -81,133 +289,138 @@ class GitHubProvider(RepoProvider):
         data = self._api_get(
             f"/repos/{repo_info.owner}/{repo_info.repo}/git/trees/{branch}",
             params={"recursive": "1"},
+            conditional=True,
         )
 
         if data.get("truncated"):
             # For very large repos, fall back to non-recursive traversal
-            return self._list_files_non_recursive(repo_info, branch, data)
+            return self._list_files_non_recursive(repo_info, branch)
 
-        files: list[FileEntry] = []
-        for item in data.get("tree", []):
-            if item["type"] != "blob":
-                continue
-            path = item["path"]
-            size = item.get("size", 0)
-            binary = is_binary_by_extension(path)
-            files.append(
-                FileEntry(
-                    path=path,
-                    size=size,
-                    is_binary=binary,
-                    language_hint=get_language_hint(path),
-                )
-            )
-        return files
+        return [
+            self._blob_entry(item["path"], item)
+            for item in data.get("tree", [])
+            if item["type"] == "blob"
+        ]
 
     def _list_files_non_recursive(
-        self, repo_info: RepoInfo, branch: str, initial_data: dict
+        self, repo_info: RepoInfo, branch: str
     ) -> list[FileEntry]:
-        """Handle truncated tree by walking directories individually."""
-        files: list[FileEntry] = []
-        dirs_to_visit: list[str] = []
+        """Handle truncated tree by listing each top-level directory separately.
 
-        for item in initial_data.get("tree", []):
+        Subtrees are fetched concurrently; a rate-limit error cancels the rest.
+        """
+        root = self._api_get(
+            f"/repos/{repo_info.owner}/{repo_info.repo}/git/trees/{branch}",
+            conditional=True,
+        )
+
+        files: list[FileEntry] = []
+        subtrees: list[tuple[str, str]] = []
+        for item in root.get("tree", []):
             if item["type"] == "blob":
-                path = item["path"]
-                files.append(
-                    FileEntry(
-                        path=path,
-                        size=item.get("size", 0),
-                        is_binary=is_binary_by_extension(path),
-                        language_hint=get_language_hint(path),
-                    )
-                )
+                files.append(self._blob_entry(item["path"], item))
             elif item["type"] == "tree":
-                dirs_to_visit.append(item["sha"])
+                subtrees.append((item["path"], item["sha"]))
 
-        for sha in dirs_to_visit:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(self._fetch_subtree, repo_info, prefix, sha)
+                for prefix, sha in subtrees
+            ]
             try:
-                sub_data = self._api_get(
+                # Collected in submission order to keep the listing stable
+                for future in futures:
+                    files.extend(future.result())
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return files
+
+    def _fetch_subtree(
+        self, repo_info: RepoInfo, prefix: str, sha: str
+    ) -> list[FileEntry]:
+        """List the blobs under one directory, with paths relative to the root."""
+        items = self._subtrees.get(sha)
+        if items is None:
+            # Not conditional: the sha already pins the content, and the
+            # body would otherwise be held by both caches
+            try:
+                data = self._api_get(
                     f"/repos/{repo_info.owner}/{repo_info.repo}/git/trees/{sha}",
                     params={"recursive": "1"},
                 )
-                for item in sub_data.get("tree", []):
-                    if item["type"] == "blob":
-                        path = item["path"]
-                        files.append(
-                            FileEntry(
-                                path=path,
-                                size=item.get("size", 0),
-                                is_binary=is_binary_by_extension(path),
-                                language_hint=get_language_hint(path),
-                            )
-                        )
+            except RateLimitError:
+                raise
             except Exception:
-                continue
+                return []
+            items = [item for item in data.get("tree", []) if item["type"] == "blob"]
+            self._subtrees.put(sha, items, len(items))
+
+        # Fresh entries every time: callers fill in content and paths
+        return [self._blob_entry(f"{prefix}/{item['path']}", item) for item in items]
+
+    @staticmethod
+    def _blob_entry(path: str, item: dict) -> FileEntry:
+        binary, hint = classify_path(path)
+        return FileEntry(
+            path=path,
+            size=item.get("size", 0),
+            is_binary=binary,
+            language_hint=hint,
+            sha=item.get("sha", ""),
+        )
 
-        return files
+    def fetch_all_files(
+        self,
+        repo_info: RepoInfo,
+        files: list[FileEntry],
+        max_file_size: int = 1_000_000,
+    ) -> Generator[FetchProgress, None, None]:
+        self._raw_unavailable.discard((repo_info.owner, repo_info.repo))
+        yield from super().fetch_all_files(repo_info, files, max_file_size)
 
-    def fetch_file_content(self, repo_info: RepoInfo, file_entry: FileEntry) -> str:
+    def fetch_file_content(
+        self,
+        repo_info: RepoInfo,
+        file_entry: FileEntry,
+        max_bytes: int = 0,
+    ) -> str:
         branch = repo_info.branch or "main"
 
+        repo_key = (repo_info.owner, repo_info.repo)
+        raw_missing = False
+
         # Try raw.githubusercontent.com first (fast, no API rate limit)
-        raw_url = (
-            f"{self.raw_base}/{repo_info.owner}/{repo_info.repo}"
-            f"/{branch}/{file_entry.path}"
-        )
-        try:
-            resp = self.session.get(raw_url, timeout=30)
-            if resp.status_code == 200:
-                return resp.text
-        except requests.RequestException:
-            pass
+        if repo_key not in self._raw_unavailable:
+            raw_url = (
+                f"{self.raw_base}/{repo_info.owner}/{repo_info.repo}"
+                f"/{branch}/{file_entry.path}"
+            )
+            try:
+                # Streamed so an oversized file is abandoned mid-transfer
+                with self.session.get(raw_url, timeout=30, stream=True) as resp:
+                    if resp.status_code == 200:
+                        data = read_capped(resp, max_bytes, file_entry.path)
+                        file_entry.size = len(data)
+                        return data.decode("utf-8", errors="replace")
+                    raw_missing = resp.status_code == 404
+            except requests.RequestException:
+                pass
 
         # Fallback to Contents API (works for private repos with token)
         data = self._api_get(
             f"/repos/{repo_info.owner}/{repo_info.repo}/contents/{file_entry.path}",
             params={"ref": branch},
         )
-        import base64
-
+        if raw_missing:
+            # The file exists but raw did not serve it; skip the probe
+            # for the rest of this repository
+            self._raw_unavailable.add(repo_key)
+        if data.get("size", 0) > max_bytes > 0:
+            raise FileTooLargeError(file_entry.path, max_bytes)
+        file_entry.size = data.get("size", file_entry.size)
         if data.get("encoding") == "base64":
-            return base64.b64decode(data["content"]).decode("utf-8", errors="replace")
+            return _b64.b64decode(data["content"]).decode("utf-8", errors="replace")
         return data.get("content", "")
-
-    def fetch_all_files(
-        self,
-        repo_info: RepoInfo,
-        files: list[FileEntry],
-        max_file_size: int = 1_000_000,
-    ) -> Generator[FetchProgress, None, None]:
-        progress = FetchProgress(total_files=len(files))
-
-        for entry in files:
-            progress.current_file = entry.path
-
-            if entry.is_binary:
-                progress.skipped_binary += 1
-                progress.fetched_files += 1
-                yield progress
-                continue
-
-            if max_file_size > 0 and entry.size > max_file_size:
-                progress.skipped_binary += 1
-                progress.fetched_files += 1
-                yield progress
-                continue
-
-            try:
-                content = self.fetch_file_content(repo_info, entry)
-                entry.content = content
-            except RateLimitError:
-                raise
-            except Exception as exc:
-                # Retry once
-                try:
-                    content = self.fetch_file_content(repo_info, entry)
-                    entry.content = content
-                except Exception as retry_exc:
-                    progress.errors.append(f"{entry.path}: {retry_exc}")
-
-            progress.fetched_files += 1
-            yield progress
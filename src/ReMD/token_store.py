@@ -2,43 +2,52 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import sys
 
 logger = logging.getLogger(__name__)
 
 _SERVICE_NAME = "ReMD"
-_AVAILABLE = False
 
-try:
-    import keyring
-    import keyring.errors
 
-    # PyInstaller frozen bundles cannot auto-detect keyring backends
-    # via entry points, so we set them explicitly.
-    if getattr(sys, "frozen", False):
-        if sys.platform == "darwin":
-            from keyring.backends import macOS
+@functools.lru_cache(maxsize=None)
+def _get_keyring():
+    """Import and configure keyring on first use.
 
-            keyring.set_keyring(macOS.Keyring())
-        elif sys.platform == "win32":
-            from keyring.backends import Windows
+    Returns the keyring module, or None if it is unavailable. Deferred so
+    that starting the app does not pay for keyring's backend discovery.
+    """
+    try:
+        import keyring
+        import keyring.errors
+
+        # PyInstaller frozen bundles cannot auto-detect keyring backends
+        # via entry points, so we set them explicitly.
+        if getattr(sys, "frozen", False):
+            if sys.platform == "darwin":
+                from keyring.backends import macOS
 
-            keyring.set_keyring(Windows.WinVaultKeyring())
+                keyring.set_keyring(macOS.Keyring())
+            elif sys.platform == "win32":
+                from keyring.backends import Windows
 
-    _AVAILABLE = True
-except Exception:
-    logger.warning("keyring not available; token persistence disabled")
+                keyring.set_keyring(Windows.WinVaultKeyring())
+    except Exception:
+        logger.warning("keyring not available; token persistence disabled")
+        return None
+    return keyring
 
 
 def is_available() -> bool:
     """Return True if the OS keychain is usable."""
-    return _AVAILABLE
+    return _get_keyring() is not None
 
 
 def load(key: str) -> str | None:
     """Load a token from the OS keychain. Returns None on failure."""
-    if not _AVAILABLE:
+    keyring = _get_keyring()
+    if keyring is None:
         return None
     try:
         return keyring.get_password(_SERVICE_NAME, key)
@@ -48,7 +57,8 @@ def load(key: str) -> str | None:
 
 def save(key: str, value: str) -> bool:
     """Save a token to the OS keychain. Returns True on success."""
-    if not _AVAILABLE or not value:
+    keyring = _get_keyring()
+    if keyring is None or not value:
         return False
     try:
         keyring.set_password(_SERVICE_NAME, key, value)
@@ -60,7 +70,8 @@ def save(key: str, value: str) -> bool:
 
 def delete(key: str) -> bool:
     """Delete a token from the OS keychain. Returns True on success."""
-    if not _AVAILABLE:
+    keyring = _get_keyring()
+    if keyring is None:
         return False
     try:
         keyring.delete_password(_SERVICE_NAME, key)
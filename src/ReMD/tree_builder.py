@@ -2,6 +2,12 @@
 
 from __future__ import annotations
 
+# Connectors before an entry, and the indentation its children inherit
+_BRANCH = "├── "
+_LAST_BRANCH = "└── "
+_PIPE = "│   "
+_BLANK = "    "
+
 
 def build_tree(paths: list[str]) -> str:
     """Build an ASCII directory tree from a list of file paths.
@@ -15,34 +21,53 @@ def build_tree(paths: list[str]) -> str:
     if not paths:
         return ""
 
-    # Build a nested dict representing the directory structure
-    tree: dict = {}
+    # Flatten the paths into (depth, name) nodes in display order. In sorted
+    # order every path under a directory's "dir/" prefix falls in one
+    # unbroken range, so each path only adds the components it does not
+    # share with the previous one.
+    depths: list[int] = []
+    names: list[str] = []
+    prev: list[str] = []
     for path in sorted(paths):
         parts = path.split("/")
-        node = tree
-        for part in parts:
-            node = node.setdefault(part, {})
-
-    lines: list[str] = []
-    _render_tree(tree, lines, prefix="")
-    return "\n".join(lines)
+        common = 0
+        for seen, part in zip(prev, parts):
+            if seen != part:
+                break
+            common += 1
+        for depth in range(common, len(parts)):
+            depths.append(depth)
+            names.append(parts[depth])
+        prev = parts
 
+    # Backward pass: a node is last if no sibling follows it before its
+    # parent's subtree ends.
+    n = len(depths)
+    is_last = [False] * n
+    has_next: list[bool] = []  # per depth: a later sibling was seen
+    for i in range(n - 1, -1, -1):
+        depth = depths[i]
+        if len(has_next) <= depth:
+            has_next.extend([False] * (depth + 1 - len(has_next)))
+        else:
+            del has_next[depth + 1:]
+        is_last[i] = not has_next[depth]
+        has_next[depth] = True
 
-def _render_tree(
-    tree: dict,
-    lines: list[str],
-    prefix: str,
-) -> None:
-    """Recursively render the tree into lines."""
-    entries = list(tree.items())
-    for i, (name, children) in enumerate(entries):
-        is_last = i == len(entries) - 1
-        connector = "└── " if is_last else "├── "
+    # Forward pass: emit lines, keeping the indentation for each depth.
+    lines: list[str] = []
+    prefixes = [""]
+    for i in range(n):
+        depth = depths[i]
+        prefix = prefixes[depth]
+        del prefixes[depth + 1:]
+        last = is_last[i]
+        connector = _LAST_BRANCH if last else _BRANCH
 
         # Append "/" for directories
-        display_name = f"{name}/" if children else name
+        is_dir = i + 1 < n and depths[i + 1] > depth
+        display_name = f"{names[i]}/" if is_dir else names[i]
         lines.append(f"{prefix}{connector}{display_name}")
 
-        if children:
-            extension = "    " if is_last else "│   "
-            _render_tree(children, lines, prefix + extension)
+        prefixes.append(prefix + (_BLANK if last else _PIPE))
+    return "\n".join(lines)
@@ -3,11 +3,25 @@
 from __future__ import annotations
 
 import re
+from typing import Callable
 from urllib.parse import urlparse
 
 from ReMD.models import ProviderType, RepoInfo
 
 
+# Branch from an Azure DevOps "version=GB<branch>" query parameter
+_BRANCH_RE = re.compile(r"version=GB(.+?)(?:&|$)")
+
+# URL paths (without surrounding slashes) for each supported layout
+_GITHUB_PATH_RE = re.compile(
+    r"(?P<owner>[^/]*)/(?P<repo>[^/]*)(?:/tree/(?P<branch>.+)|/.*)?"
+)
+_AZDO_NEW_PATH_RE = re.compile(
+    r"(?P<org>[^/]*)/(?P<project>[^/]*)/_git/(?P<repo>[^/]*)(?:/.*)?"
+)
+_AZDO_OLD_PATH_RE = re.compile(r"(?P<project>[^/]*)/_git/(?P<repo>[^/]*)(?:/.*)?")
+
+
 class URLParseError(Exception):
     """Raised when a URL cannot be parsed."""
 
@@ -36,87 +50,89 @@ def parse_repo_url(url: str) -> RepoInfo:
     host = parsed.hostname or ""
     path = parsed.path.strip("/")
 
-    if host == "dev.azure.com":
-        return _parse_azure_devops_new(path, parsed.query, url)
-    elif host.endswith(".visualstudio.com"):
-        org = host.removesuffix(".visualstudio.com")
-        return _parse_azure_devops_old(org, path, parsed.query, url)
-    else:
-        # github.com or GitHub Enterprise (any other host)
-        return _parse_github(path, url, api_host=host)
+    handler = _HOST_HANDLERS.get(host) or next(
+        (h for suffix, h in _HOST_SUFFIX_HANDLERS if host.endswith(suffix)),
+        # GitHub Enterprise (any other host)
+        _parse_github,
+    )
+    return handler(host, path, parsed.query, url)
 
 
-def _parse_github(path: str, raw_url: str, api_host: str = "github.com") -> RepoInfo:
+def _parse_github(host: str, path: str, query: str, raw_url: str) -> RepoInfo:
     """Parse a GitHub URL path."""
     # path: owner/repo[/tree/branch[/...]]
-    parts = path.split("/")
-    if len(parts) < 2:
+    # Everything after /tree/ is the branch name (may contain slashes)
+    match = _GITHUB_PATH_RE.fullmatch(path)
+    if match is None:
         raise URLParseError(f"GitHub URL must include owner/repo: {raw_url}")
 
-    owner, repo = parts[0], parts[1]
-    # Remove .git suffix if present
-    repo = repo.removesuffix(".git")
-    branch = None
-
-    if len(parts) >= 4 and parts[2] == "tree":
-        # Everything after /tree/ is the branch name (may contain slashes)
-        branch = "/".join(parts[3:])
-
     return RepoInfo(
         provider=ProviderType.GITHUB,
-        owner=owner,
-        repo=repo,
-        branch=branch,
-        api_host=api_host,
+        owner=match["owner"],
+        # Remove .git suffix if present
+        repo=match["repo"].removesuffix(".git"),
+        branch=match["branch"],
+        api_host=host,
         raw_url=raw_url,
     )
 
 
-def _parse_azure_devops_new(path: str, query: str, raw_url: str) -> RepoInfo:
+def _parse_azure_devops_new(
+    host: str, path: str, query: str, raw_url: str
+) -> RepoInfo:
     """Parse dev.azure.com URL path: org/project/_git/repo"""
-    parts = path.split("/")
-    if len(parts) < 4 or parts[2] != "_git":
+    match = _AZDO_NEW_PATH_RE.fullmatch(path)
+    if match is None:
         raise URLParseError(
             f"Azure DevOps URL must match org/project/_git/repo: {raw_url}"
         )
 
-    org, project, _, repo = parts[0], parts[1], parts[2], parts[3]
-    branch = _extract_azdo_branch(query)
-
     return RepoInfo(
         provider=ProviderType.AZURE_DEVOPS,
-        owner=org,
-        repo=repo,
-        branch=branch,
-        project=project,
+        owner=match["org"],
+        repo=match["repo"],
+        branch=_extract_azdo_branch(query),
+        project=match["project"],
         raw_url=raw_url,
     )
 
 
 def _parse_azure_devops_old(
-    org: str, path: str, query: str, raw_url: str
+    host: str, path: str, query: str, raw_url: str
 ) -> RepoInfo:
     """Parse org.visualstudio.com URL path: project/_git/repo"""
-    parts = path.split("/")
-    if len(parts) < 3 or parts[1] != "_git":
+    org = host.removesuffix(".visualstudio.com")
+    match = _AZDO_OLD_PATH_RE.fullmatch(path)
+    if match is None:
         raise URLParseError(
             f"Azure DevOps URL must match project/_git/repo: {raw_url}"
         )
 
-    project, _, repo = parts[0], parts[1], parts[2]
-    branch = _extract_azdo_branch(query)
-
     return RepoInfo(
         provider=ProviderType.AZURE_DEVOPS,
         owner=org,
-        repo=repo,
-        branch=branch,
-        project=project,
+        repo=match["repo"],
+        branch=_extract_azdo_branch(query),
+        project=match["project"],
         raw_url=raw_url,
     )
 
 
 def _extract_azdo_branch(query: str) -> str | None:
     """Extract branch from Azure DevOps query string (version=GBbranch)."""
-    match = re.search(r"version=GB(.+?)(?:&|$)", query)
+    match = _BRANCH_RE.search(query)
     return match.group(1) if match else None
+
+
+# Host parsers, each taking (host, path, query, raw_url): exact hosts first,
+# then host suffixes; any other host is treated as GitHub Enterprise.
+_HostHandler = Callable[[str, str, str, str], RepoInfo]
+
+_HOST_HANDLERS: dict[str, _HostHandler] = {
+    "github.com": _parse_github,
+    "dev.azure.com": _parse_azure_devops_new,
+}
+
+_HOST_SUFFIX_HANDLERS: tuple[tuple[str, _HostHandler], ...] = (
+    (".visualstudio.com", _parse_azure_devops_old),
+)
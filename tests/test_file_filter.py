@@ -1,12 +1,18 @@
 """Tests for file_filter module."""
 
+import re
+
 from ReMD.file_filter import (
+    classify_path,
     compile_patterns,
+    compile_union,
     get_language_hint,
     is_binary_by_content,
     is_binary_by_extension,
     matches_any_pattern,
     parse_pattern_input,
+    split_backref_patterns,
+    split_suffix_patterns,
     validate_patterns,
 )
 
@@ -30,6 +36,7 @@ class TestIsBinaryByExtension:
     def test_case_insensitive(self):
         assert is_binary_by_extension("image.PNG") is True
         assert is_binary_by_extension("photo.JPG") is True
+        assert is_binary_by_extension("assets/.DS_Store") is True
 
     def test_nested_path(self):
         assert is_binary_by_extension("src/assets/logo.png") is True
@@ -74,6 +81,27 @@ class TestGetLanguageHint:
     def test_unknown_extension(self):
         assert get_language_hint("data.xyz") == ""
 
+    def test_case_insensitive(self):
+        assert get_language_hint("MAIN.PY") == "python"
+        assert get_language_hint("analysis.R") == "r"
+
+    def test_dot_in_directory_only(self):
+        assert get_language_hint("conf.d/LICENSE") == ""
+
+
+class TestClassifyPath:
+    def test_text_file(self):
+        assert classify_path("src/main.py") == (False, "python")
+
+    def test_binary_file_has_no_hint(self):
+        assert classify_path("assets/logo.PNG") == (True, "")
+
+    def test_special_filename(self):
+        assert classify_path("docker/Dockerfile") == (False, "dockerfile")
+
+    def test_no_extension(self):
+        assert classify_path("conf.d/LICENSE") == (False, "")
+
 
 class TestParsePatternInput:
     def test_empty_string(self):
@@ -114,6 +142,18 @@ class TestValidatePatterns:
     def test_empty_list(self):
         assert validate_patterns([]) == []
 
+    def test_patterns_that_cannot_be_combined(self):
+        errors = validate_patterns([r"(?P<ext>py)$", r"(?P<ext>js)$"])
+        assert len(errors) == 1
+        assert "cannot be combined" in errors[0]
+
+    def test_numbered_references_kept_out_of_union(self):
+        patterns = [r"(z)\1", r"(x)(y)\2"]
+        assert validate_patterns(patterns) == []
+        combinable, standalone = split_backref_patterns(patterns)
+        assert combinable == []
+        assert any(re.search(p, "src/xyy.py") for p in standalone)
+
 
 class TestCompilePatterns:
     def test_compiles_valid(self):
@@ -128,27 +168,99 @@ class TestCompilePatterns:
         assert compile_patterns([]) == []
 
 
+class TestCompileUnion:
+    def test_combines_patterns(self):
+        union = compile_union([r"\.py$", r"\.js$"])
+        assert union.pattern == r"(?:\.py$)|(?:\.js$)"
+
+    def test_skips_invalid(self):
+        union = compile_union([r"\.py$", r"[bad", r"\.js$"])
+        assert union.pattern == r"(?:\.py$)|(?:\.js$)"
+
+    def test_empty_returns_none(self):
+        assert compile_union([]) is None
+
+    def test_all_invalid_returns_none(self):
+        assert compile_union([r"[bad"]) is None
+
+    def test_leading_flags_are_scoped(self):
+        union = compile_union([r"(?i)\.md$", r"\.PY$"])
+        assert union.search("README.MD")
+        assert union.search("main.PY")
+        assert not union.search("main.py")
+
+
 class TestMatchesAnyPattern:
     def test_matches(self):
-        compiled = compile_patterns([r"\.py$", r"\.js$"])
-        assert matches_any_pattern("src/main.py", compiled) is True
-        assert matches_any_pattern("lib/index.js", compiled) is True
+        union = compile_union([r"\.py$", r"\.js$"])
+        assert matches_any_pattern("src/main.py", union) is True
+        assert matches_any_pattern("lib/index.js", union) is True
 
     def test_no_match(self):
-        compiled = compile_patterns([r"\.py$"])
-        assert matches_any_pattern("style.css", compiled) is False
+        union = compile_union([r"\.py$"])
+        assert matches_any_pattern("style.css", union) is False
 
-    def test_empty_patterns_matches_all(self):
-        assert matches_any_pattern("anything.txt", []) is True
+    def test_no_pattern_matches_all(self):
+        assert matches_any_pattern("anything.txt", None) is True
 
     def test_partial_match(self):
-        compiled = compile_patterns([r"src/"])
-        assert matches_any_pattern("src/main.py", compiled) is True
-        assert matches_any_pattern("lib/main.py", compiled) is False
+        union = compile_union([r"src/"])
+        assert matches_any_pattern("src/main.py", union) is True
+        assert matches_any_pattern("lib/main.py", union) is False
 
     def test_complex_pattern(self):
-        compiled = compile_patterns([r"src/.*\.(ts|tsx)$"])
-        assert matches_any_pattern("src/App.tsx", compiled) is True
-        assert matches_any_pattern("src/utils/helper.ts", compiled) is True
-        assert matches_any_pattern("src/style.css", compiled) is False
-        assert matches_any_pattern("lib/App.tsx", compiled) is False
+        union = compile_union([r"src/.*\.(ts|tsx)$"])
+        assert matches_any_pattern("src/App.tsx", union) is True
+        assert matches_any_pattern("src/utils/helper.ts", union) is True
+        assert matches_any_pattern("src/style.css", union) is False
+        assert matches_any_pattern("lib/App.tsx", union) is False
+
+
+class TestSplitBackrefPatterns:
+    def test_separates_numbered_references(self):
+        combinable, standalone = split_backref_patterns(
+            [r"\.py$", r"(a)\1", r"src/", r"(x)?(?(1)y|z)"]
+        )
+        assert combinable == [r"\.py$", r"src/"]
+        assert standalone == [r"(a)\1", r"(x)?(?(1)y|z)"]
+
+    def test_escaped_backslash_is_not_a_reference(self):
+        assert split_backref_patterns([r"\\1"]) == ([r"\\1"], [])
+
+    def test_named_references_are_combinable(self):
+        assert split_backref_patterns([r"(?P<c>a)(?P=c)"]) == ([r"(?P<c>a)(?P=c)"], [])
+
+
+class TestSplitSuffixPatterns:
+    def test_suffix_patterns(self):
+        suffixes, others = split_suffix_patterns([r"\.py$", r"\.ts$"])
+        assert suffixes == (".py", ".ts")
+        assert others == []
+
+    def test_multi_dot_suffix(self):
+        suffixes, others = split_suffix_patterns([r"\.tar\.gz$"])
+        assert suffixes == (".tar.gz",)
+        assert others == []
+
+    def test_general_patterns_kept(self):
+        suffixes, others = split_suffix_patterns(
+            [r"src/.*\.js$", r"\.py", r"\.py$", r"test"]
+        )
+        assert suffixes == (".py",)
+        assert others == [r"src/.*\.js$", r"\.py", r"test"]
+
+    def test_unescaped_dot_is_not_suffix(self):
+        suffixes, others = split_suffix_patterns([r".py$"])
+        assert suffixes == ()
+        assert others == [r".py$"]
+
+    def test_empty(self):
+        assert split_suffix_patterns([]) == ((), [])
+
+    def test_equivalent_to_regex(self):
+        paths = ["a.py", "a.pyc", "src/b.py", "py", "a.PY", "x.tar.gz"]
+        for pattern in [r"\.py$", r"\.tar\.gz$"]:
+            suffixes, _ = split_suffix_patterns([pattern])
+            union = compile_union([pattern])
+            for path in paths:
+                assert path.endswith(suffixes) == matches_any_pattern(path, union)
@@ -2,8 +2,10 @@
 
 import responses
 import pytest
+from responses import matchers
 
 from ReMD.models import FileEntry, ProviderType, RepoInfo
+from ReMD.providers.base import FileTooLargeError, _blob_cache
 from ReMD.providers.github import GitHubError, GitHubProvider, RateLimitError
 
 
@@ -16,34 +18,104 @@ def _repo_info(branch: str | None = "main") -> RepoInfo:
     )
 
 
+@pytest.fixture(autouse=True)
+def _empty_blob_cache():
+    """The blob cache is shared process-wide; start every test without it."""
+    _blob_cache.clear()
+    yield
+    _blob_cache.clear()
+
+
+@pytest.fixture
+def provider():
+    """A fresh provider per test, so its per-instance caches do not leak."""
+    with GitHubProvider() as p:
+        yield p
+
+
+class TestClose:
+    def test_context_manager_closes_session(self, monkeypatch):
+        closed = []
+        with GitHubProvider() as provider:
+            monkeypatch.setattr(provider.session, "close", lambda: closed.append(True))
+        assert closed == [True]
+
+
 class TestGetDefaultBranch:
     @responses.activate
-    def test_returns_default_branch(self):
+    def test_returns_default_branch(self, provider):
         responses.add(
             responses.GET,
             "https://api.github.com/repos/testowner/testrepo",
             json={"default_branch": "main"},
             status=200,
         )
-        provider = GitHubProvider()
         assert provider.get_default_branch(_repo_info(None)) == "main"
 
     @responses.activate
-    def test_404_raises(self):
+    def test_remembered_per_repo(self, provider):
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/testowner/testrepo",
+            json={"default_branch": "main"},
+            status=200,
+        )
+        assert provider.get_default_branch(_repo_info()) == "main"
+        assert provider.get_default_branch(_repo_info()) == "main"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_404_raises(self, provider):
         responses.add(
             responses.GET,
             "https://api.github.com/repos/testowner/testrepo",
             json={"message": "Not Found"},
             status=404,
         )
-        provider = GitHubProvider()
         with pytest.raises(GitHubError, match="not found"):
             provider.get_default_branch(_repo_info(None))
 
 
+class TestConditionalRequests:
+    @responses.activate
+    def test_not_modified_reuses_cached_body(self, provider):
+        url = "https://api.github.com/repos/testowner/testrepo"
+        responses.add(
+            responses.GET,
+            url,
+            json={"default_branch": "develop"},
+            headers={"ETag": '"abc123"'},
+            status=200,
+        )
+        responses.add(responses.GET, url, status=304)
+        assert provider.get_default_branch(_repo_info(None)) == "develop"
+        provider.clear_cache()
+        assert provider.get_default_branch(_repo_info(None)) == "develop"
+        assert "If-None-Match" not in responses.calls[0].request.headers
+        assert responses.calls[1].request.headers["If-None-Match"] == '"abc123"'
+
+    @responses.activate
+    def test_cache_bounded_by_tree_entries(self, monkeypatch):
+        monkeypatch.setattr(GitHubProvider, "tree_cache_entries", 2)
+        url = "https://api.github.com/repos/testowner/testrepo/git/trees/main"
+        tree = [{"type": "blob", "path": f"f{i}.py", "sha": str(i)} for i in range(3)]
+        for _ in range(2):
+            responses.add(
+                responses.GET,
+                url,
+                json={"sha": "abc", "truncated": False, "tree": tree},
+                headers={"ETag": '"big"'},
+                status=200,
+            )
+        with GitHubProvider() as provider:
+            provider.list_files(_repo_info())
+            provider.list_files(_repo_info())
+        assert "If-None-Match" not in responses.calls[1].request.headers
+
+
 class TestListFiles:
     @responses.activate
-    def test_lists_blobs(self):
+    def test_lists_blobs(self, provider):
         responses.add(
             responses.GET,
             "https://api.github.com/repos/testowner/testrepo/git/trees/main",
@@ -59,7 +131,6 @@ class TestListFiles:
             },
             status=200,
         )
-        provider = GitHubProvider()
         files = provider.list_files(_repo_info())
         assert len(files) == 3
         paths = [f.path for f in files]
@@ -72,7 +143,7 @@ class TestListFiles:
         assert png_file.is_binary is True
 
     @responses.activate
-    def test_resolves_default_branch_if_none(self):
+    def test_resolves_default_branch_if_none(self, provider):
         responses.add(
             responses.GET,
             "https://api.github.com/repos/testowner/testrepo",
@@ -85,29 +156,106 @@ class TestListFiles:
             json={"sha": "abc", "truncated": False, "tree": []},
             status=200,
         )
-        provider = GitHubProvider()
         info = _repo_info(branch=None)
         files = provider.list_files(info)
         assert files == []
         assert info.branch == "develop"
 
+    @responses.activate
+    def test_truncated_tree_lists_top_level_subtrees(self, provider):
+        tree_url = "https://api.github.com/repos/testowner/testrepo/git/trees"
+        responses.add(
+            responses.GET,
+            f"{tree_url}/main",
+            match=[matchers.query_param_matcher({"recursive": "1"})],
+            json={"sha": "root", "truncated": True, "tree": []},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{tree_url}/main",
+            match=[matchers.query_param_matcher({})],
+            json={
+                "sha": "root",
+                "truncated": False,
+                "tree": [
+                    {"type": "blob", "path": "README.md", "size": 10, "sha": "r"},
+                    {"type": "tree", "path": "src", "sha": "srcsha"},
+                    {"type": "tree", "path": "docs", "sha": "docsha"},
+                ],
+            },
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{tree_url}/srcsha",
+            json={
+                "sha": "srcsha",
+                "truncated": False,
+                "tree": [
+                    {"type": "blob", "path": "main.py", "size": 20, "sha": "m"},
+                    {"type": "tree", "path": "pkg", "sha": "pkgsha"},
+                    {"type": "blob", "path": "pkg/util.py", "size": 30, "sha": "u"},
+                ],
+            },
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{tree_url}/docsha",
+            json={
+                "sha": "docsha",
+                "truncated": False,
+                "tree": [{"type": "blob", "path": "index.md", "size": 5, "sha": "i"}],
+            },
+            status=200,
+        )
+        files = provider.list_files(_repo_info())
+        assert [f.path for f in files] == [
+            "README.md",
+            "src/main.py",
+            "src/pkg/util.py",
+            "docs/index.md",
+        ]
+        assert len(responses.calls) == 4
+
 
 class TestFetchFileContent:
     @responses.activate
-    def test_raw_githubusercontent(self):
+    def test_raw_githubusercontent(self, provider):
         responses.add(
             responses.GET,
             "https://raw.githubusercontent.com/testowner/testrepo/main/README.md",
             body="# Hello",
             status=200,
         )
-        provider = GitHubProvider()
         entry = FileEntry(path="README.md", size=7)
         content = provider.fetch_file_content(_repo_info(), entry)
         assert content == "# Hello"
 
     @responses.activate
-    def test_fallback_to_contents_api(self):
+    def test_transient_gateway_error_retried(self, provider):
+        url = "https://raw.githubusercontent.com/testowner/testrepo/main/README.md"
+        responses.add(responses.GET, url, status=503)
+        responses.add(responses.GET, url, body="# Hello", status=200)
+        entry = FileEntry(path="README.md", size=7)
+        assert provider.fetch_file_content(_repo_info(), entry) == "# Hello"
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_oversized_raw_content_raises(self, provider):
+        responses.add(
+            responses.GET,
+            "https://raw.githubusercontent.com/testowner/testrepo/main/big.txt",
+            body="x" * 2000,
+            status=200,
+        )
+        entry = FileEntry(path="big.txt")
+        with pytest.raises(FileTooLargeError):
+            provider.fetch_file_content(_repo_info(), entry, max_bytes=1000)
+
+    @responses.activate
+    def test_fallback_to_contents_api(self, provider):
         import base64
 
         responses.add(
@@ -122,15 +270,68 @@ class TestFetchFileContent:
             json={"content": encoded, "encoding": "base64"},
             status=200,
         )
-        provider = GitHubProvider()
         entry = FileEntry(path="secret.py", size=11)
         content = provider.fetch_file_content(_repo_info(), entry)
         assert content == "print('hi')"
 
 
+class TestRawUnavailable:
+    @responses.activate
+    def test_skips_raw_after_private_repo_miss(self):
+        import base64
+
+        raw = "https://raw.githubusercontent.com/testowner/testrepo/main"
+        api = "https://api.github.com/repos/testowner/testrepo/contents"
+        responses.add(responses.GET, f"{raw}/a.py", status=404)
+        for name in ("a.py", "b.py"):
+            responses.add(
+                responses.GET,
+                f"{api}/{name}",
+                json={
+                    "encoding": "base64",
+                    "content": base64.b64encode(name.encode()).decode(),
+                },
+                status=200,
+            )
+        with GitHubProvider(token="t") as provider:
+            for name in ("a.py", "b.py"):
+                entry = FileEntry(path=name)
+                assert provider.fetch_file_content(_repo_info(), entry) == name
+        assert [c.request.url.split("?")[0] for c in responses.calls] == [
+            f"{raw}/a.py",
+            f"{api}/a.py",
+            f"{api}/b.py",
+        ]
+
+    @responses.activate
+    def test_raw_probed_again_on_next_run(self, provider):
+        raw = "https://raw.githubusercontent.com/testowner/testrepo/main/a.py"
+        responses.add(responses.GET, raw, status=404)
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/testowner/testrepo/contents/a.py",
+            json={"encoding": "base64", "content": "YQ=="},
+            status=200,
+        )
+        responses.add(responses.GET, raw, body="a", status=200)
+        first = FileEntry(path="a.py")
+        list(provider.fetch_all_files(_repo_info(), [first]))
+        assert first.content == "a"
+
+        second = FileEntry(path="a.py")
+        list(provider.fetch_all_files(_repo_info(), [second]))
+        assert second.content == "a"
+        assert responses.calls[-1].request.url == raw
+
+    def test_clear_cache_forgets_raw_misses(self, provider):
+        provider._raw_unavailable.add(("testowner", "testrepo"))
+        provider.clear_cache()
+        assert provider._raw_unavailable == set()
+
+
 class TestRateLimit:
     @responses.activate
-    def test_rate_limit_raises(self):
+    def test_rate_limit_raises(self, provider):
         responses.add(
             responses.GET,
             "https://api.github.com/repos/testowner/testrepo",
@@ -141,29 +342,237 @@ class TestRateLimit:
                 "X-RateLimit-Reset": "9999999999",
             },
         )
-        provider = GitHubProvider()
         with pytest.raises(RateLimitError):
             provider.get_default_branch(_repo_info(None))
 
 
+class TestRateLimitThrottling:
+    @responses.activate
+    def test_retry_after_honored(self, monkeypatch, provider):
+        sleeps = []
+        monkeypatch.setattr("ReMD.providers.github.time.sleep", sleeps.append)
+        url = "https://api.github.com/repos/testowner/testrepo"
+        responses.add(
+            responses.GET, url, status=403, headers={"Retry-After": "3"}
+        )
+        responses.add(responses.GET, url, json={"default_branch": "main"}, status=200)
+        assert provider.get_default_branch(_repo_info(None)) == "main"
+        assert sleeps == [3.0]
+
+    @responses.activate
+    def test_long_retry_after_raises(self, provider):
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/testowner/testrepo",
+            status=429,
+            headers={"Retry-After": "3600"},
+        )
+        with pytest.raises(RateLimitError):
+            provider.get_default_branch(_repo_info(None))
+
+    @responses.activate
+    def test_waits_for_reset_when_budget_low(self, monkeypatch, provider):
+        sleeps = []
+        monkeypatch.setattr("ReMD.providers.github.time.sleep", sleeps.append)
+        monkeypatch.setattr("ReMD.providers.github.time.time", lambda: 1000.0)
+        url = "https://api.github.com/repos/testowner/testrepo"
+        responses.add(
+            responses.GET,
+            url,
+            json={"default_branch": "main"},
+            headers={"X-RateLimit-Remaining": "2", "X-RateLimit-Reset": "1030"},
+            status=200,
+        )
+        provider.get_default_branch(_repo_info(None))
+        assert sleeps == []
+        provider.clear_cache()
+        provider.get_default_branch(_repo_info(None))
+        assert sleeps == [30.0]
+
+
+class TestWaitOnRateLimit:
+    @responses.activate
+    def test_sleeps_until_reset_then_retries(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("ReMD.providers.github.time.sleep", sleeps.append)
+        monkeypatch.setattr("ReMD.providers.github.time.time", lambda: 1000.0)
+        url = "https://api.github.com/repos/testowner/testrepo"
+        responses.add(
+            responses.GET,
+            url,
+            status=403,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1020"},
+        )
+        responses.add(responses.GET, url, json={"default_branch": "main"}, status=200)
+        with GitHubProvider(wait_on_rate_limit=True) as provider:
+            assert provider.get_default_branch(_repo_info(None)) == "main"
+        assert sleeps == [20.0]
+
+    @responses.activate
+    def test_distant_reset_still_raises(self, monkeypatch):
+        monkeypatch.setattr("ReMD.providers.github.time.time", lambda: 1000.0)
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/testowner/testrepo",
+            status=403,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "4600"},
+        )
+        with GitHubProvider(wait_on_rate_limit=True) as provider:
+            with pytest.raises(RateLimitError):
+                provider.get_default_branch(_repo_info(None))
+        assert len(responses.calls) == 1
+
+
 class TestFetchAllFiles:
     @responses.activate
-    def test_skips_binary_and_large(self):
+    def test_skips_binary_and_large(self, provider):
         responses.add(
             responses.GET,
             "https://raw.githubusercontent.com/testowner/testrepo/main/small.py",
             body="x = 1",
             status=200,
         )
-        provider = GitHubProvider()
         files = [
             FileEntry(path="logo.png", size=5000, is_binary=True),
             FileEntry(path="huge.dat", size=2_000_000),
             FileEntry(path="small.py", size=5),
         ]
         results = list(provider.fetch_all_files(_repo_info(), files, max_file_size=1_000_000))
-        assert len(results) == 3
         final = results[-1]
         assert final.fetched_files == 3
         assert final.skipped_binary == 2
         assert files[2].content == "x = 1"
+
+    @responses.activate
+    def test_skipped_files_reported_before_downloads(self, provider):
+        responses.add(
+            responses.GET,
+            "https://raw.githubusercontent.com/testowner/testrepo/main/small.py",
+            body="x = 1",
+            status=200,
+        )
+        files = [
+            FileEntry(path="logo.png", size=5000, is_binary=True),
+            FileEntry(path="small.py", size=5),
+        ]
+        updates = provider.fetch_all_files(_repo_info(), files)
+        first = next(updates)
+        assert (first.fetched_files, first.skipped_binary) == (1, 1)
+        assert len(responses.calls) == 0
+        assert list(updates)[-1].fetched_files == 2
+
+    @responses.activate
+    def test_fetches_many_files(self, provider):
+        files = []
+        for i in range(20):
+            responses.add(
+                responses.GET,
+                f"https://raw.githubusercontent.com/testowner/testrepo/main/f{i}.py",
+                body=f"x = {i}",
+                status=200,
+            )
+            files.append(FileEntry(path=f"f{i}.py", size=5))
+        final = list(provider.fetch_all_files(_repo_info(), files))[-1]
+        assert final.fetched_files == 20
+        assert final.errors == []
+        assert [f.content for f in files] == [f"x = {i}" for i in range(20)]
+
+    @responses.activate
+    def test_oversized_content_counted_as_skipped(self, provider):
+        responses.add(
+            responses.GET,
+            "https://raw.githubusercontent.com/testowner/testrepo/main/big.txt",
+            body="x" * 2000,
+            status=200,
+        )
+        entry = FileEntry(path="big.txt")  # size missing from the listing
+        final = list(provider.fetch_all_files(_repo_info(), [entry], max_file_size=1000))[-1]
+        assert final.skipped_binary == 1
+        assert final.errors == []
+        assert entry.content is None
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_progress_updates_are_coalesced(self, provider):
+        files = [FileEntry(path=f"img{i}.png", is_binary=True) for i in range(50)]
+        results = list(provider.fetch_all_files(_repo_info(), files))
+        assert len(results) < len(files)
+        assert results[-1].fetched_files == 50
+        assert results[-1].skipped_binary == 50
+
+    @responses.activate
+    def test_retry_on_failure_then_success(self, provider):
+        url = "https://raw.githubusercontent.com/testowner/testrepo/main/a.py"
+        responses.add(responses.GET, url, status=500)
+        responses.add(responses.GET, url, status=502)
+        responses.add(responses.GET, url, body="ok", status=200)
+        entry = FileEntry(path="a.py", size=2)
+        final = list(provider.fetch_all_files(_repo_info(), [entry]))[-1]
+        assert final.errors == []
+        assert entry.content == "ok"
+
+    @responses.activate
+    def test_error_appended_on_double_failure(self, provider):
+        url = "https://raw.githubusercontent.com/testowner/testrepo/main/a.py"
+        api_url = "https://api.github.com/repos/testowner/testrepo/contents/a.py"
+        responses.add(responses.GET, url, status=404)
+        responses.add(responses.GET, api_url, status=500)
+        entry = FileEntry(path="a.py", size=2)
+        final = list(provider.fetch_all_files(_repo_info(), [entry]))[-1]
+        assert final.fetched_files == 1
+        assert len(final.errors) == 1
+        assert final.errors[0].startswith("a.py: ")
+        assert entry.content is None
+
+    @responses.activate
+    def test_rate_limit_reraised_immediately(self, provider):
+        responses.add(
+            responses.GET,
+            "https://raw.githubusercontent.com/testowner/testrepo/main/a.py",
+            status=404,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/testowner/testrepo/contents/a.py",
+            json={"message": "rate limit"},
+            status=403,
+            headers={
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": "9999999999",
+            },
+        )
+        entry = FileEntry(path="a.py", size=2)
+        with pytest.raises(RateLimitError):
+            list(provider.fetch_all_files(_repo_info(), [entry]))
+
+    @responses.activate
+    def test_repeat_fetch_served_from_blob_cache(self, provider):
+        url = "https://raw.githubusercontent.com/testowner/testrepo/main/cached.py"
+        responses.add(responses.GET, url, body="y = 2", status=200)
+        first = FileEntry(path="cached.py", size=5, sha="b10bcace")
+        list(provider.fetch_all_files(_repo_info(), [first]))
+
+        second = FileEntry(path="cached.py", size=5, sha="b10bcace")
+        # A new provider, as the app creates per token and host
+        with GitHubProvider() as other:
+            final = list(other.fetch_all_files(_repo_info(), [second]))[-1]
+        assert final.fetched_files == 1
+        assert second.content == "y = 2"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_cached_content_rechecked_against_size_limit(self, provider):
+        url = "https://raw.githubusercontent.com/testowner/testrepo/main/big.txt"
+        responses.add(responses.GET, url, body="x" * 5000, status=200)
+        first = FileEntry(path="big.txt", sha="b16b10b")  # size missing
+        list(provider.fetch_all_files(_repo_info(), [first], max_file_size=10_000))
+        assert first.content is not None
+        assert first.size == 5000
+
+        second = FileEntry(path="big.txt", sha="b16b10b")
+        final = list(
+            provider.fetch_all_files(_repo_info(), [second], max_file_size=1000)
+        )[-1]
+        assert final.skipped_binary == 1
+        assert second.content is None
+        assert len(responses.calls) == 1
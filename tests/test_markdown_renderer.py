@@ -0,0 +1,83 @@
+"""Tests for markdown_renderer module."""
+
+import io
+
+from ReMD.markdown_renderer import iter_markdown, render_markdown, write_markdown
+from ReMD.models import FileEntry
+
+
+class TestRenderMarkdown:
+    def test_full_document(self):
+        files = [
+            FileEntry(path="README.md", content="# Hello", language_hint="markdown"),
+            FileEntry(path="src/main.py", content="print('hi')", language_hint="python"),
+        ]
+        assert render_markdown("owner/repo", files) == (
+            "# Repository: owner/repo\n"
+            "\n"
+            "## File Structure\n"
+            "\n"
+            "```\n"
+            "├── README.md\n"
+            "└── src/\n"
+            "    └── main.py\n"
+            "```\n"
+            "\n"
+            "## Files\n"
+            "\n"
+            "### `README.md`\n"
+            "\n"
+            "```markdown\n"
+            "# Hello\n"
+            "```\n"
+            "\n"
+            "### `src/main.py`\n"
+            "\n"
+            "```python\n"
+            "print('hi')\n"
+            "```\n"
+        )
+
+    def test_no_files(self):
+        assert render_markdown("owner/repo", []) == (
+            "# Repository: owner/repo\n"
+            "\n"
+            "## File Structure\n"
+            "\n"
+            "```\n"
+            "\n"
+            "```\n"
+            "\n"
+            "## Files\n"
+        )
+
+    def test_skips_binary_and_unfetched(self):
+        files = [
+            FileEntry(path="logo.png", is_binary=True),
+            FileEntry(path="missing.py"),
+            FileEntry(path="main.py", content="x = 1"),
+        ]
+        result = render_markdown("owner/repo", files)
+        assert "logo.png" not in result
+        assert "missing.py" not in result
+        assert "### `main.py`" in result
+
+    def test_uses_entry_language_hint(self):
+        files = [FileEntry(path="app.ts", content="let x = 1;", language_hint="typescript")]
+        assert "```typescript\nlet x = 1;\n```" in render_markdown("o/r", files)
+
+
+class TestWriteMarkdown:
+    def test_matches_render_markdown(self):
+        files = [FileEntry(path="a/b.py", content="pass"), FileEntry(path="c.txt", content="")]
+        out = io.StringIO()
+        write_markdown(out, "owner/repo", files)
+        assert out.getvalue() == render_markdown("owner/repo", files)
+
+
+class TestIterMarkdown:
+    def test_chunks_join_to_document(self):
+        files = [FileEntry(path="a.py", content="pass", language_hint="python")]
+        chunks = list(iter_markdown("owner/repo", files))
+        assert len(chunks) > 1
+        assert "".join(chunks) == render_markdown("owner/repo", files)
@@ -0,0 +1,68 @@
+"""Tests for token_store module."""
+
+import sys
+import types
+
+import pytest
+
+from ReMD import token_store
+
+
+@pytest.fixture(autouse=True)
+def _reset_keyring_probe():
+    token_store._get_keyring.cache_clear()
+    yield
+    token_store._get_keyring.cache_clear()
+
+
+@pytest.fixture
+def fake_keyring(monkeypatch):
+    """Install an in-memory stand-in for the keyring package."""
+    store: dict[tuple[str, str], str] = {}
+    module = types.ModuleType("keyring")
+    module.get_password = lambda service, key: store.get((service, key))
+    module.set_password = lambda service, key, value: store.__setitem__(
+        (service, key), value
+    )
+    module.delete_password = lambda service, key: store.pop((service, key))
+    module.errors = types.ModuleType("keyring.errors")
+    monkeypatch.setitem(sys.modules, "keyring", module)
+    monkeypatch.setitem(sys.modules, "keyring.errors", module.errors)
+    return store
+
+
+class TestKeyringAvailable:
+    def test_round_trip(self, fake_keyring):
+        assert token_store.is_available() is True
+        assert token_store.save("github_token", "secret") is True
+        assert token_store.load("github_token") == "secret"
+        assert token_store.delete("github_token") is True
+        assert token_store.load("github_token") is None
+
+    def test_empty_value_not_saved(self, fake_keyring):
+        assert token_store.save("github_token", "") is False
+        assert fake_keyring == {}
+
+    def test_delete_missing_returns_false(self, fake_keyring):
+        assert token_store.delete("github_token") is False
+
+    def test_probed_once(self, fake_keyring):
+        token_store.is_available()
+        token_store.load("github_token")
+        token_store.save("github_token", "secret")
+        info = token_store._get_keyring.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+
+class TestKeyringMissing:
+    @pytest.fixture(autouse=True)
+    def _no_keyring(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "keyring", None)
+
+    def test_not_available(self):
+        assert token_store.is_available() is False
+
+    def test_operations_degrade(self):
+        assert token_store.load("github_token") is None
+        assert token_store.save("github_token", "secret") is False
+        assert token_store.delete("github_token") is False
@@ -48,3 +48,29 @@ class TestBuildTree:
         assert "a.txt" in lines[0]
         assert "m.txt" in lines[1]
         assert "z.txt" in lines[2]
+
+    def test_continuation_bars(self):
+        paths = ["src/lib/b.py", "src/lib/c.py", "src/a.py", "tests/t.py", "README.md"]
+        assert build_tree(paths) == "\n".join([
+            "├── README.md",
+            "├── src/",
+            "│   ├── a.py",
+            "│   └── lib/",
+            "│       ├── b.py",
+            "│       └── c.py",
+            "└── tests/",
+            "    └── t.py",
+        ])
+
+    def test_duplicate_paths(self):
+        assert build_tree(["a/b.txt", "a/b.txt"]) == "└── a/\n    └── b.txt"
+
+    def test_prefixed_names_keep_directories_contiguous(self):
+        paths = ["a/y.txt", "a-b/x.txt", "a.txt"]
+        assert build_tree(paths) == "\n".join([
+            "├── a-b/",
+            "│   └── x.txt",
+            "├── a.txt",
+            "└── a/",
+            "    └── y.txt",
+        ])